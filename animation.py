@@ -0,0 +1,58 @@
+"""One scheduler for every animated pet.
+
+Instead of an after() timer per pet, the animation loop advances this
+scheduler by the simulated time of each frame. Pets sharing a sprite share
+its decoded frames, the current frame index is worked out once per sprite,
+and a pet's image is only swapped when its frame actually changes.
+"""
+
+
+class FrameScheduler:
+    """Tracks which animation frame each animated pet is showing"""
+
+    def __init__(self):
+        self.elapsed_ms = 0.0
+
+        # pet_id -> [sprite, index of the frame on screen or None]
+        self.pets = {}
+
+    def __len__(self):
+        return len(self.pets)
+
+    def add(self, pet_id, sprite):
+        """Start animating a pet; still sprites are ignored"""
+        if sprite.animated:
+            # Pets are added showing the sprite's first frame
+            self.pets[pet_id] = [sprite, 0]
+
+    def remove(self, pet_id):
+        self.pets.pop(pet_id, None)
+
+    def clear(self):
+        self.pets = {}
+
+    def invalidate(self, pet_id=None):
+        """Forget what is on screen (one pet, or all) so the next advance redraws it"""
+        if pet_id is None:
+            for state in self.pets.values():
+                state[1] = None
+        elif pet_id in self.pets:
+            self.pets[pet_id][1] = None
+
+    def advance(self, ms, renderer, skip=()):
+        """Move time on by `ms` and push changed frames to the renderer.
+
+        Pets in `skip` (e.g. showing an impact effect) are left alone.
+        """
+        self.elapsed_ms += ms
+        frame_of = {}
+        for pet_id, state in self.pets.items():
+            if pet_id in skip:
+                continue
+            sprite = state[0]
+            frame = frame_of.get(sprite.key)
+            if frame is None:
+                frame = frame_of[sprite.key] = sprite.frame_at(self.elapsed_ms)
+            if frame != state[1]:
+                renderer.set_image(pet_id, sprite.frame_images[frame])
+                state[1] = frame
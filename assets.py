@@ -0,0 +1,200 @@
+"""Every pet image loaded this session.
+
+Uploading a new image no longer throws the previous one away: decoded
+images stay in the library, so switching back (or re-picking the same
+file) never decodes it again. The library and the sprite cache share one
+memory budget; when it is exceeded, scaled sizes no pet is using go first,
+least recently used first, then whole images nobody is using.
+
+With a storage.BlobCache, decoded images are also kept on disk, keyed by
+their content hash, together with which file (and modification time)
+each came from. Later runs can map them back in with restore() or
+find_file() without decoding the file again.
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from images import Animation
+from sprites import image_key
+
+# Memory for decoded images plus their cached scaled sprites
+MEMORY_BUDGET_MB = 64
+
+
+class Asset:
+    """A decoded pet image (or animation) as uploaded"""
+
+    def __init__(self, name, animation, path=None, key=None, mtime=None):
+        self.name = name
+        self.animation = animation
+        self.path = path
+        if mtime is None and path:
+            mtime = os.path.getmtime(path)
+        self.mtime = mtime
+
+        # Hashed once here so launching doesn't re-read every pixel
+        if key is not None:
+            self.key = key
+        elif self.animated:
+            self.key = image_key(*animation.frames, durations=animation.durations)
+        else:
+            self.key = image_key(animation.frames[0])
+
+    @property
+    def image(self):
+        """The first (or only) frame"""
+        return self.animation.frames[0]
+
+    @property
+    def animated(self):
+        return len(self.animation.frames) > 1
+
+    @property
+    def nbytes(self):
+        return sum(frame.width * frame.height * len(frame.getbands()) for frame in self.animation.frames)
+
+
+class AssetLibrary:
+    """Decoded pet images by name, in least recently used order"""
+
+    def __init__(self, sprites, budget_mb=MEMORY_BUDGET_MB, disk=None):
+        self.sprites = sprites
+        self.disk = disk
+        self.budget = budget_mb * 1024 * 1024
+        self.assets = OrderedDict()
+
+        # The image new pets are launched from; never evicted
+        self.selected = None
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __contains__(self, name):
+        return name in self.assets
+
+    def names(self):
+        return list(self.assets)
+
+    def get(self, name):
+        return self.assets.get(name)
+
+    def find_key(self, key):
+        """The loaded asset with this content hash, or None"""
+        for asset in self.assets.values():
+            if asset.key == key:
+                return asset
+        return None
+
+    def find_file(self, path):
+        """The asset already decoded from this file, unless the file has changed"""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        for asset in self.assets.values():
+            if asset.path == path and asset.mtime == mtime:
+                return asset
+
+        # Decoded in an earlier run?
+        if self.disk is not None:
+            found = self.disk.get(("file", path, mtime))
+            if found is not None:
+                return self.restore(found[1]["asset"])
+        return None
+
+    def restore(self, key):
+        """Bring back an asset saved to disk by an earlier run, or None"""
+        asset = self.find_key(key)
+        if asset is not None:
+            return asset
+        if self.disk is None:
+            return None
+        found = self.disk.get(("asset", key))
+        if found is None:
+            return None
+
+        array, meta = found
+        frames = [Image.fromarray(frame, "RGBA") for frame in array]
+        asset = Asset(meta["name"], Animation(frames, meta["durations"]), meta["path"], key, meta["mtime"])
+        return self._insert(asset)
+
+    def add(self, name, animation, path=None):
+        """Add a decoded image and return its asset.
+
+        Images identical to one already loaded return that asset instead;
+        a different image with a name in use gets a numbered name.
+        """
+        asset = Asset(name, animation, path)
+        for existing in self.assets.values():
+            if existing.key == asset.key:
+                self.touch(existing)
+                return existing
+
+        self._insert(asset)
+        if self.disk is not None:
+            self._save(asset)
+        return asset
+
+    def _insert(self, asset):
+        base, number = asset.name, 2
+        while asset.name in self.assets:
+            asset.name = f"{base} ({number})"
+            number += 1
+        self.assets[asset.name] = asset
+        return asset
+
+    def _save(self, asset):
+        """Write the decoded frames to the disk cache in the background"""
+        frames = [frame if frame.mode == "RGBA" else frame.convert("RGBA") for frame in asset.animation.frames]
+        try:
+            array = np.stack([np.asarray(frame) for frame in frames])
+        except ValueError:
+            # Frames of different sizes; not worth caching
+            return
+        self.disk.put_later(("asset", asset.key), array, name=asset.name, path=asset.path,
+                            mtime=asset.mtime, durations=list(asset.animation.durations))
+        if asset.path:
+            self.disk.put_later(("file", asset.path, asset.mtime), np.empty(0), asset=asset.key)
+
+    def touch(self, asset):
+        """Mark an asset as just used"""
+        self.assets.move_to_end(asset.name)
+
+    def select(self, asset):
+        self.selected = asset
+        self.touch(asset)
+        self.trim()
+
+    def acquire(self, asset, scale=1.0):
+        """Sprite of an asset at this scale; pair with release()"""
+        self.touch(asset)
+        sprite = self.sprites.acquire(asset.key, asset.image, scale,
+                                      animation=asset.animation if asset.animated else None)
+        self.trim()
+        return sprite
+
+    def release(self, sprite):
+        self.sprites.release(sprite)
+        self.trim()
+
+    @property
+    def nbytes(self):
+        return sum(asset.nbytes for asset in self.assets.values()) + self.sprites.nbytes
+
+    def trim(self):
+        """Evict until within budget; the selected image and images with live pets stay"""
+        source_bytes = sum(asset.nbytes for asset in self.assets.values())
+        self.sprites.evict_unused(self.budget - source_bytes)
+
+        for asset in list(self.assets.values()):
+            if source_bytes + self.sprites.nbytes <= self.budget:
+                break
+            if asset is self.selected or self.sprites.in_use(asset.key):
+                continue
+            self.sprites.evict_unused(0, source_key=asset.key)
+            del self.assets[asset.name]
+            source_bytes -= asset.nbytes
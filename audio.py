@@ -0,0 +1,237 @@
+"""Bounded bounce-sound playback.
+
+A pile of pets can report dozens of impacts per second. Rather than firing
+a Sound.play() for each, impacts are collected for a short window and only
+the hardest few are played, on a fixed set of reserved mixer channels.
+Volume and pitch follow the impact speed, and when every channel is busy
+a new impact only steals the quietest one if it is louder.
+
+AudioWorker runs all of this on its own thread, which owns the pygame
+mixer. The animation loop only drops impacts onto a queue, so it never
+waits on the audio backend.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pygame
+
+from synth import SoundBank, build_default_bank
+
+# Channels reserved for bounce sounds
+VOICES = 8
+
+# Impacts closer together than this are merged into one burst
+COALESCE_SECONDS = 0.04
+
+# Most sounds started per burst
+MAX_PER_BURST = 3
+
+# Impacts slower than this (pixels per tick) are silent
+MIN_AUDIBLE_SPEED = 2.0
+
+# Impact speed that plays at full volume / highest pitch
+FULL_VOLUME_SPEED = 25.0
+
+# Quietest volume an audible impact plays at
+MIN_VOLUME = 0.15
+
+
+class VoicePool:
+    """Plays coalesced impacts on a fixed set of reserved channels"""
+
+    def __init__(self, sound_bank, voices=VOICES, now=time.perf_counter):
+        self.sound_bank = sound_bank
+        self.now = now
+
+        # Reserve the first `voices` channels so Sound.play() elsewhere can't take them
+        if pygame.mixer.get_num_channels() < voices:
+            pygame.mixer.set_num_channels(voices)
+        pygame.mixer.set_reserved(voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+
+        # Volume each channel was last started at, for voice stealing
+        self.channel_volume = [0.0] * voices
+
+        # Impacts waiting for the current burst: (speed, width)
+        self.pending = []
+        self.burst_start = now()
+
+    def impact(self, width, speed):
+        """Queue an impact for the current burst"""
+        if speed >= MIN_AUDIBLE_SPEED:
+            if not self.pending:
+                # The burst's window opens with its first impact, not the last flush
+                self.burst_start = self.now()
+            self.pending.append((speed, width))
+
+    def discard(self):
+        """Forget queued impacts without playing them"""
+        self.pending = []
+
+    def update(self):
+        """Play the current burst once its window has passed"""
+        if self.pending and self.now() - self.burst_start >= COALESCE_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """Play the hardest pending impacts now"""
+        pending, self.pending = self.pending, []
+        self.burst_start = self.now()
+        if not self.sound_bank:
+            return
+
+        pending.sort(reverse=True)
+        for speed, width in pending[:MAX_PER_BURST]:
+            intensity = min((speed - MIN_AUDIBLE_SPEED) / (FULL_VOLUME_SPEED - MIN_AUDIBLE_SPEED), 1.0)
+            volume = MIN_VOLUME + (1.0 - MIN_VOLUME) * intensity
+            if not self._play(self.sound_bank.pick(width, intensity), volume):
+                # Everything playing is louder; softer impacts won't fit either
+                break
+
+    def _play(self, sound, volume):
+        """Start a sound on a free channel, or steal a quieter one"""
+        index = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                index = i
+                break
+
+        if index is None:
+            quietest = min(range(len(self.channels)), key=self.channel_volume.__getitem__)
+            if self.channel_volume[quietest] >= volume:
+                return False
+            index = quietest
+
+        channel = self.channels[index]
+        channel.play(sound)
+        channel.set_volume(volume)
+        self.channel_volume[index] = volume
+        return True
+
+    def stop(self):
+        self.discard()
+        for channel in self.channels:
+            channel.stop()
+
+
+class AudioWorker:
+    """Background thread that owns the mixer, the sound bank and the voice pool.
+
+    Every public method only puts a message on the queue (or sets a flag),
+    so it is safe and cheap to call from the Tk thread.
+    """
+
+    def __init__(self, cache=None):
+        # Optional storage.BlobCache for the synthesized tones
+        self.cache = cache
+        self.queue = queue.SimpleQueue()
+        self.ready = threading.Event()
+
+        # Set by the worker once the mixer is up, False if that failed
+        self.available = False
+
+        # Impacts are dropped at the source while sound is switched off
+        self.enabled = True
+
+        self.thread = threading.Thread(target=self._run, name="audio", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def impact(self, width, speed):
+        """Queue an impact; never blocks"""
+        if self.enabled and self.available:
+            self.queue.put(("impact", width, speed))
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.queue.put(("discard",))
+
+    def flush(self):
+        """Play whatever impacts are still waiting"""
+        self.queue.put(("flush",))
+
+    def load_files(self, paths):
+        """Load sound files as the new bank.
+
+        Returns a Future resolving to (number loaded, [(path, error), ...]);
+        if nothing loaded the default sounds are restored.
+        """
+        future = Future()
+        self.queue.put(("load", list(paths), future))
+        return future
+
+    def stop(self, timeout=1.0):
+        if self.thread.is_alive():
+            self.queue.put(("stop",))
+            self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            pygame.mixer.init()
+            pool = VoicePool(build_default_bank(self.cache))
+            self.available = True
+        except Exception as e:
+            print(f"Sound initialization error: {e}")
+            return
+        finally:
+            self.ready.set()
+
+        try:
+            self._serve(pool)
+        finally:
+            try:
+                pygame.mixer.quit()
+            except Exception:
+                pass
+
+    def _serve(self, pool):
+        """Handle messages until told to stop, playing bursts as they come due"""
+        failed = False
+        while True:
+            try:
+                # Nothing to play: sleep until a message comes in
+                message = self.queue.get(timeout=COALESCE_SECONDS if pool.pending else None)
+            except queue.Empty:
+                message = None
+
+            try:
+                if message is not None:
+                    kind = message[0]
+                    if kind == "stop":
+                        pool.stop()
+                        return
+                    elif kind == "impact":
+                        if not failed:
+                            pool.impact(message[1], message[2])
+                    elif kind == "discard":
+                        pool.discard()
+                    elif kind == "flush":
+                        pool.flush()
+                    elif kind == "load":
+                        self._load(pool, message[1], message[2])
+
+                pool.update()
+            except Exception as e:
+                # Stay quiet from now on instead of erroring every frame
+                if not failed:
+                    print(f"Error playing sound: {e}")
+                failed = True
+                pool.discard()
+
+    def _load(self, pool, paths, future):
+        sounds = []
+        errors = []
+        for path in paths:
+            try:
+                sounds.append(pygame.mixer.Sound(path))
+            except Exception as e:
+                errors.append((os.path.basename(path), str(e)))
+
+        # Uploaded sounds replace the default bank for every pet size
+        pool.sound_bank = SoundBank.single(sounds) if sounds else build_default_bank(self.cache)
+        future.set_result((len(sounds), errors))
@@ -0,0 +1,258 @@
+"""Benchmark the animation loop as the number of pets grows.
+
+For each pet count the script launches that many pets, then runs a fixed
+number of frames and reports per-frame p50/p95/p99 time, frames that
+overran the 15 ms tick budget and Tk calls per frame. Results are written
+as JSON so runs from different commits can be compared.
+
+Renderers:
+    none     physics and collisions only, no display needed
+    window   the full EnhancedPet.run_frame with one window per pet
+    overlay  the full EnhancedPet.run_frame with the single overlay canvas
+
+The Tk renderers need a display; a virtual one works, e.g.
+    xvfb-run -a python benchmarks/bench_animate.py --renderer window
+
+Compare two runs:
+    python benchmarks/bench_animate.py --output new.json --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from clock import SimulationClock, TICK
+from physics import PhysicsWorld, PhysicsSettings
+from masks import AlphaMask
+from desktop import FakeWindowProvider
+
+DEFAULT_COUNTS = [1, 10, 50, 200, 1000]
+SCREEN_SIZE = (1920, 1080)
+SPRITE_SIZE = 64
+FRAME_BUDGET_MS = TICK * 1000
+
+
+class CountingTk:
+    """Wraps the Tcl interpreter and counts every call made through it"""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._tkapp, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class FakeTime:
+    """A perf_counter stand-in advanced by exactly one tick per frame"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def round_mask(size):
+    """A disc filling a size x size sprite, like a typical round pet"""
+    ys, xs = np.mgrid[0:size, 0:size] - (size - 1) / 2
+    return AlphaMask(xs ** 2 + ys ** 2 <= (size / 2) ** 2)
+
+
+def fake_windows(count, rng):
+    """Application windows scattered over the lower part of the screen"""
+    rects = []
+    for _ in range(count):
+        width, height = rng.randint(300, 900), rng.randint(200, 600)
+        left = rng.randint(0, SCREEN_SIZE[0] - width)
+        top = rng.randint(SCREEN_SIZE[1] // 3, SCREEN_SIZE[1] - height)
+        rects.append((left, top, left + width, top + height))
+    return FakeWindowProvider(rects)
+
+
+class PhysicsOnly:
+    """The headless part of a frame: fixed ticks of world.step plus interpolation"""
+
+    def __init__(self, count, seed, masks=False, windows=0):
+        rng = random.Random(seed)
+        self.world = PhysicsWorld(*SCREEN_SIZE)
+        self.settings = PhysicsSettings()
+        self.fake_time = FakeTime()
+        self.clock = SimulationClock(now=self.fake_time)
+        size = SPRITE_SIZE + 20
+        mask = round_mask(SPRITE_SIZE) if masks else None
+        self.world.set_obstacles(fake_windows(windows, rng).windows())
+        for _ in range(count):
+            self.world.add_body(rng.randint(0, SCREEN_SIZE[0] - size),
+                                rng.randint(0, SCREEN_SIZE[1] - size),
+                                size, size, rng.uniform(-3, 3), rng.uniform(-4, 0), mask=mask)
+        self.tk = None
+
+    def frame(self):
+        self.fake_time.now += TICK
+        for _ in range(self.clock.advance()):
+            self.world.step(self.settings)
+        self.world.interpolate(self.clock.alpha).astype(int).tolist()
+
+    def close(self):
+        pass
+
+
+class FullApp:
+    """EnhancedPet with real pets, driven one frame at a time"""
+
+    def __init__(self, count, seed, overlay):
+        # Keep pygame quiet and off the real sound card
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+        import tkinter as tk
+        from PIL import Image
+        from main import EnhancedPet
+
+        random.seed(seed)
+        self.root = tk.Tk()
+        self.tk = CountingTk(self.root.tk)
+        self.root.tk = self.tk
+
+        # Leave the user's saved session alone
+        self.app = EnhancedPet(self.root, use_session=False)
+        self.app.overlay_mode.set(overlay)
+        self.app.set_active_image(Image.new("RGBA", (SPRITE_SIZE, SPRITE_SIZE), (255, 160, 0, 255)))
+
+        # Frames are driven by hand, so keep the after() loop from starting
+        self.app.animating = True
+        for _ in range(count):
+            self.app.launch_pet()
+
+        self.fake_time = FakeTime()
+        self.app.clock = SimulationClock(now=self.fake_time)
+        self.root.update()
+
+    def frame(self):
+        self.fake_time.now += TICK
+        self.app.run_frame()
+        self.root.update_idletasks()
+
+    def close(self):
+        self.app.on_root_close()
+        self.app.cleanup()
+
+
+def run_case(renderer, count, frames, warmup, seed, masks=False, windows=0):
+    if renderer == "none":
+        bench = PhysicsOnly(count, seed, masks, windows)
+    else:
+        bench = FullApp(count, seed, overlay=(renderer == "overlay"))
+
+    try:
+        for _ in range(warmup):
+            bench.frame()
+
+        times = []
+        calls_before = bench.tk.calls if bench.tk else 0
+        for _ in range(frames):
+            start = time.perf_counter()
+            bench.frame()
+            times.append((time.perf_counter() - start) * 1000)
+        calls = (bench.tk.calls - calls_before) if bench.tk else 0
+    finally:
+        bench.close()
+
+    times = np.array(times)
+    return {
+        "pets": count,
+        "mean_ms": round(float(times.mean()), 4),
+        "p50_ms": round(float(np.percentile(times, 50)), 4),
+        "p95_ms": round(float(np.percentile(times, 95)), 4),
+        "p99_ms": round(float(np.percentile(times, 99)), 4),
+        "max_ms": round(float(times.max()), 4),
+        "missed_frames": int((times > FRAME_BUDGET_MS).sum()),
+        "tk_calls_per_frame": round(calls / frames, 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print p50/p95 ratios against an earlier run"""
+    with open(baseline_path) as f:
+        baseline = {row["pets"]: row for row in json.load(f)["results"]}
+
+    print(f"\nCompared with {baseline_path}:")
+    for row in results:
+        old = baseline.get(row["pets"])
+        if old is None:
+            continue
+        ratios = []
+        for key in ("p50_ms", "p95_ms"):
+            ratio = row[key] / old[key] if old[key] else float("inf")
+            ratios.append(f"{key} x{ratio:.2f}")
+        print(f"  {row['pets']:>5} pets: " + ", ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renderer", choices=["none", "window", "overlay"], default="none")
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--masks", action="store_true",
+                        help="give headless pets pixel collision masks (renderer none only)")
+    parser.add_argument("--windows", type=int, default=0,
+                        help="fake application windows as obstacles (renderer none only)")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'pets':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'missed':>7} {'tk/frame':>9}")
+    for count in args.counts:
+        row = run_case(args.renderer, count, args.frames, args.warmup, args.seed, args.masks, args.windows)
+        results.append(row)
+        print(f"{count:>5} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f} "
+              f"{row['missed_frames']:>7} {row['tk_calls_per_frame']:>9}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "renderer": args.renderer,
+        "masks": args.masks,
+        "windows": args.windows,
+        "frames": args.frames,
+        "frame_budget_ms": FRAME_BUDGET_MS,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
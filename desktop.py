@@ -0,0 +1,234 @@
+"""Other applications' windows as obstacles pets can land on.
+
+A WindowProvider lists the desktop's visible top-level windows as screen
+rectangles (left, top, right, bottom), title bar and border included.
+Asking the window system is slow (on X11 it means running xprop and
+xwininfo), so WindowWatcher does it on its own thread, a couple of times a
+second while windows are moving and less and less often while they stay
+put, and keeps the latest list. The Tk thread only ever takes that list,
+so the frame loop never waits on the window system.
+
+FakeWindowProvider serves a fixed list instead, for tests and benchmarks.
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+# Seconds between window list refreshes right after a change; every
+# refresh that finds nothing new doubles the wait, up to the slowest rate
+REFRESH_SECONDS = 0.5
+SLOWEST_REFRESH_SECONDS = 4.0
+
+# Longest a single xprop / xwininfo call may take
+QUERY_TIMEOUT = 2.0
+
+# Window types that are part of the desktop itself, not obstacles
+IGNORED_TYPES = ("_NET_WM_WINDOW_TYPE_DESKTOP",)
+
+# _NET_WM_DESKTOP of windows shown on every workspace
+ALL_DESKTOPS = 0xFFFFFFFF
+
+# Per-window properties, read when a window first appears and again when
+# the focus or the workspace changes (minimizing or restoring moves focus)
+WINDOW_PROPERTIES = ("_NET_WM_PID", "_NET_WM_WINDOW_TYPE", "_NET_FRAME_EXTENTS",
+                     "_NET_WM_STATE", "_NET_WM_DESKTOP")
+
+# "NAME(TYPE) = value" and "NAME(WINDOW): window id # 0x..." lines of xprop output
+XPROP_LINE = re.compile(r"^(\w+)\(\w+\)(?: =|:) (.*)$", re.MULTILINE)
+WINDOW_ID = re.compile(r"0x[0-9a-fA-F]+")
+
+# "0x1e00003 "title": ("xterm" "XTerm")  800x600+0+0  +101+237" lines of
+# xwininfo -tree output: id, width, height, then the absolute position
+XWININFO_TREE_LINE = re.compile(
+    r"^\s*(0x[0-9a-fA-F]+)\s.*\s(\d+)x(\d+)\+-?\d+\+-?\d+\s+\+(-?\d+)\+(-?\d+)\s*$", re.MULTILINE)
+
+
+class WindowProvider:
+    """Lists the visible top-level windows of other applications"""
+
+    def windows(self):
+        """Return a list of (left, top, right, bottom) screen rectangles.
+
+        Called on the watcher thread; may be slow, may raise.
+        """
+        raise NotImplementedError
+
+
+class FakeWindowProvider(WindowProvider):
+    """Serves whatever rectangles it is given"""
+
+    def __init__(self, rects=()):
+        self.rects = list(rects)
+
+    def windows(self):
+        return list(self.rects)
+
+
+class X11WindowProvider(WindowProvider):
+    """The windows the window manager lists in _NET_CLIENT_LIST.
+
+    Minimized windows and windows on other workspaces are skipped, as are
+    desktop windows and this process's own windows.
+
+    A refresh costs two calls: one xprop for the client list, focus and
+    workspace, and one xwininfo for every window's position. Each window's
+    own properties are cached by id and only read again for new windows,
+    or for all of them when the focus or the workspace changed.
+    """
+
+    def __init__(self, own_pid=None):
+        self.own_pid = os.getpid() if own_pid is None else own_pid
+
+        # Window id -> parsed WINDOW_PROPERTIES, for the listed windows
+        self.properties = {}
+
+        # Active window and workspace the cached properties were read under
+        self.focus = None
+
+    @staticmethod
+    def available():
+        """True on an X11 session with xprop and xwininfo installed"""
+        return (sys.platform.startswith("linux") and bool(os.environ.get("DISPLAY"))
+                and shutil.which("xprop") is not None and shutil.which("xwininfo") is not None)
+
+    def windows(self):
+        root = dict(XPROP_LINE.findall(self._run(
+            "xprop", "-root", "_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW", "_NET_CURRENT_DESKTOP")))
+        window_ids = [int(window_id, 16) for window_id in WINDOW_ID.findall(root.get("_NET_CLIENT_LIST", ""))]
+        current_desktop = self._number(root.get("_NET_CURRENT_DESKTOP"), 0)
+
+        focus = (root.get("_NET_ACTIVE_WINDOW"), current_desktop)
+        if focus != self.focus:
+            self.properties = {}
+            self.focus = focus
+        self.properties = {window_id: self.properties[window_id]
+                           for window_id in window_ids if window_id in self.properties}
+        for window_id in window_ids:
+            if window_id not in self.properties:
+                try:
+                    self.properties[window_id] = self._read_properties(window_id)
+                except (OSError, subprocess.SubprocessError):
+                    # Closed since the list was read
+                    continue
+
+        geometry = {int(window_id, 16): tuple(int(v) for v in values)
+                    for window_id, *values in XWININFO_TREE_LINE.findall(
+                        self._run("xwininfo", "-root", "-tree"))}
+
+        rects = []
+        for window_id, properties in self.properties.items():
+            if window_id not in geometry or not self._shown(properties, current_desktop):
+                continue
+            width, height, left, top = geometry[window_id]
+            # The title bar and borders sit outside the client area
+            frame_left, frame_right, frame_top, frame_bottom = properties["frame"]
+            rects.append((left - frame_left, top - frame_top,
+                          left + width + frame_right, top + height + frame_bottom))
+        return rects
+
+    def _read_properties(self, window_id):
+        """The WINDOW_PROPERTIES of one client window, parsed"""
+        values = dict(XPROP_LINE.findall(self._run("xprop", "-id", hex(window_id), *WINDOW_PROPERTIES)))
+        try:
+            frame = tuple(int(v) for v in values.get("_NET_FRAME_EXTENTS", "").split(","))
+        except ValueError:
+            frame = ()
+        if len(frame) != 4:
+            frame = (0, 0, 0, 0)
+        return {
+            "own": values.get("_NET_WM_PID", "").strip() == str(self.own_pid),
+            "ignored": any(kind in values.get("_NET_WM_WINDOW_TYPE", "") for kind in IGNORED_TYPES),
+            "hidden": "_NET_WM_STATE_HIDDEN" in values.get("_NET_WM_STATE", ""),
+            "desktop": self._number(values.get("_NET_WM_DESKTOP"), ALL_DESKTOPS),
+            "frame": frame,
+        }
+
+    @staticmethod
+    def _shown(properties, current_desktop):
+        """Whether a window with these properties is an obstacle right now"""
+        if properties["own"] or properties["ignored"] or properties["hidden"]:
+            return False
+        return properties["desktop"] in (current_desktop, ALL_DESKTOPS)
+
+    @staticmethod
+    def _number(value, default):
+        """A CARDINAL xprop value, or default if it is missing or unreadable"""
+        try:
+            return int(value.strip())
+        except (AttributeError, ValueError):
+            return default
+
+    @staticmethod
+    def _run(*command):
+        return subprocess.run(command, capture_output=True, text=True, check=True,
+                              timeout=QUERY_TIMEOUT).stdout
+
+
+def default_window_provider():
+    """The provider for this desktop, or None if windows can't be listed here"""
+    if X11WindowProvider.available():
+        return X11WindowProvider()
+    return None
+
+
+class WindowWatcher:
+    """Background thread that re-lists the windows every `interval` seconds,
+    backing off to every `slowest_interval` seconds while nothing changes.
+
+    take() is safe and cheap to call from the Tk thread. Subclasses watch
+    other rectangle lists by overriding _list() (see monitors.MonitorWatcher).
+    """
+
+    # What is being listed, for the thread name and error messages
+    listing = "windows"
+
+    def __init__(self, provider, interval=REFRESH_SECONDS, slowest_interval=SLOWEST_REFRESH_SECONDS):
+        self.provider = provider
+        self.interval = interval
+        self.slowest_interval = slowest_interval
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+        # Latest list not yet taken, or None
+        self.latest = None
+
+        self.thread = threading.Thread(target=self._run, name=f"{self.listing}-watcher", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def take(self):
+        """The rectangles if they changed since the last take(), else None"""
+        with self.lock:
+            rects, self.latest = self.latest, None
+        return rects
+
+    def stop(self, timeout=1.0):
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    def _run(self):
+        previous = None
+        interval = self.interval
+        while not self.stopping.is_set():
+            try:
+                rects = sorted(self._list())
+            except Exception as e:
+                print(f"Error listing {self.listing}: {e}")
+                rects = previous
+            if rects != previous:
+                with self.lock:
+                    self.latest = rects
+                previous = rects
+                interval = self.interval
+            else:
+                interval = min(interval * 2, self.slowest_interval)
+            self.stopping.wait(interval)
+
+    def _list(self):
+        """The current rectangles; runs on the watcher thread"""
+        return self.provider.windows()
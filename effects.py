@@ -0,0 +1,74 @@
+"""Impact effects for pet sprites.
+
+Each effect turns a sprite image into a same-sized deformed copy, so it can
+be swapped onto a pet's canvas item without moving or resizing anything.
+They are pure PIL/NumPy and are only ever run when a sprite's frame atlas
+is built, never from the animation loop.
+"""
+import numpy as np
+from PIL import Image
+
+# Effect frames shown after an impact, in order; each is held for IMPACT_FRAME_TICKS
+IMPACT_SEQUENCE = ("squash", "squash", "bulge", "stretch")
+IMPACT_FRAME_TICKS = 2
+
+# How far squash/stretch deform the sprite (fraction of its size)
+SQUASH_AMOUNT = 0.2
+
+# How strongly bulge magnifies the middle of the sprite (0 = not at all)
+BULGE_STRENGTH = 0.35
+
+
+def _rescale_on_floor(image, scale_x, scale_y):
+    """Resize around the bottom centre, keeping the original canvas size"""
+    image = image.convert("RGBA")
+    width, height = image.size
+    new_width = max(1, int(width * scale_x))
+    new_height = max(1, int(height * scale_y))
+    scaled = image.resize((new_width, new_height), Image.BILINEAR)
+
+    frame = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    frame.paste(scaled, ((width - new_width) // 2, height - new_height), scaled)
+    return frame
+
+
+def squash(image):
+    """Flattened and widened, as if landing hard"""
+    return _rescale_on_floor(image, 1 + SQUASH_AMOUNT, 1 - SQUASH_AMOUNT)
+
+
+def stretch(image):
+    """Narrowed and heightened, springing back up"""
+    return _rescale_on_floor(image, 1 - SQUASH_AMOUNT / 2, 1 + SQUASH_AMOUNT / 2)
+
+
+def bulge(image, strength=BULGE_STRENGTH):
+    """Magnify the centre of the sprite with a radial warp"""
+    pixels = np.asarray(image.convert("RGBA"))
+    height, width = pixels.shape[:2]
+    cx, cy = (width - 1) / 2, (height - 1) / 2
+
+    # Normalised offsets from the centre; the unit ellipse touches the edges
+    ys, xs = np.mgrid[0:height, 0:width]
+    dx = (xs - cx) / max(cx, 1)
+    dy = (ys - cy) / max(cy, 1)
+    radius = np.hypot(dx, dy)
+
+    # Sample closer to the centre the closer the pixel is to it
+    scale = np.where(radius < 1, (1 - strength) + strength * radius, 1.0)
+    src_x = np.clip(np.rint(cx + dx * scale * max(cx, 1)), 0, width - 1).astype(np.intp)
+    src_y = np.clip(np.rint(cy + dy * scale * max(cy, 1)), 0, height - 1).astype(np.intp)
+    return Image.fromarray(pixels[src_y, src_x], "RGBA")
+
+
+# Named effects: name -> function(PIL image) -> PIL image of the same size
+EFFECTS = {
+    "squash": squash,
+    "stretch": stretch,
+    "bulge": bulge,
+}
+
+
+def render_impact_frames(image, sequence=IMPACT_SEQUENCE):
+    """Render each distinct effect in `sequence` once; returns {name: image}"""
+    return {name: EFFECTS[name](image) for name in set(sequence)}
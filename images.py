@@ -0,0 +1,107 @@
+"""Loading pet images off the Tk thread.
+
+Decoding a multi-megapixel photo and scaling it down can take long enough
+to stall the animation, so upload_image hands the path to ImageLoader and
+polls the returned Future. JPEGs are decoded straight at a reduced scale
+(Image.draft) and the final resize uses thumbnail()'s reducing_gap, which
+shrinks by whole factors first and only runs the slow filter at the end.
+
+Animated GIFs and sprite sheets are split into frames here, once; a sheet
+is recognised by its file name, e.g. "cat_sheet4x2.png" is a grid of
+4 columns by 2 rows read left to right, top to bottom.
+"""
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageSequence
+
+# Largest width or height of a pet image
+MAX_IMAGE_SIZE = 200
+
+# thumbnail() reduces by integer factors down to this multiple of the target size
+# before resampling; larger is closer to a plain LANCZOS resize but slower
+REDUCING_GAP = 3.0
+
+# Frames kept from an animation; longer ones are cut short
+MAX_FRAMES = 120
+
+# Frame time for sprite sheets, and for GIF frames that don't say (ms)
+DEFAULT_FRAME_MS = 100
+
+# Shortest frame time honoured; GIFs asking for less are slowed to this
+MIN_FRAME_MS = 20
+
+# "<name>_sheet<columns>x<rows>.<ext>"
+SHEET_PATTERN = re.compile(r"_sheet(\d+)x(\d+)$", re.IGNORECASE)
+
+# A decoded pet image: one or more PIL frames and how long each shows (ms).
+# Still images have a single frame.
+Animation = namedtuple("Animation", ["frames", "durations"])
+
+
+def shrink(image, max_size):
+    """Scale an image down in place to fit max_size x max_size"""
+    if image.width > max_size or image.height > max_size:
+        image.thumbnail((max_size, max_size), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+    else:
+        image.load()
+    return image
+
+
+def decode_image(path, max_size=MAX_IMAGE_SIZE):
+    """Open, decode and shrink an image (or each frame of it) to fit max_size"""
+    sheet = SHEET_PATTERN.search(os.path.splitext(os.path.basename(path))[0])
+    with Image.open(path) as image:
+        if sheet:
+            return _split_sheet(image, int(sheet.group(1)), int(sheet.group(2)), max_size)
+        if getattr(image, "n_frames", 1) > 1:
+            return _gif_frames(image, max_size)
+
+        # JPEG only: let the decoder downscale by 1/2, 1/4 or 1/8 on the fly
+        if image.format == "JPEG":
+            image.draft("RGB", (max_size, max_size))
+        return Animation([shrink(image, max_size)], [DEFAULT_FRAME_MS])
+
+
+def _gif_frames(image, max_size):
+    frames = []
+    durations = []
+    for frame in ImageSequence.Iterator(image):
+        # Each frame is a full composite once converted
+        durations.append(max(frame.info.get("duration") or DEFAULT_FRAME_MS, MIN_FRAME_MS))
+        frames.append(shrink(frame.convert("RGBA"), max_size))
+        if len(frames) == MAX_FRAMES:
+            break
+    return Animation(frames, durations)
+
+
+def _split_sheet(image, columns, rows, max_size):
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Bad sprite sheet grid {columns}x{rows}")
+    sheet = image.convert("RGBA")
+    cell_width, cell_height = sheet.width // columns, sheet.height // rows
+    frames = []
+    for row in range(rows):
+        for column in range(columns):
+            left, top = column * cell_width, row * cell_height
+            cell = sheet.crop((left, top, left + cell_width, top + cell_height))
+            frames.append(shrink(cell, max_size))
+    frames = frames[:MAX_FRAMES]
+    return Animation(frames, [DEFAULT_FRAME_MS] * len(frames))
+
+
+class ImageLoader:
+    """Decodes images on a background thread, one at a time"""
+
+    def __init__(self, max_size=MAX_IMAGE_SIZE):
+        self.max_size = max_size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-loader")
+
+    def load(self, path):
+        """Start decoding; returns a Future resolving to an Animation"""
+        return self.executor.submit(decode_image, path, self.max_size)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
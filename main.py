@@ -1,15 +1,47 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk, ImageFilter
+from PIL import ImageTk
 import random
-import math
 import pygame
 import os
 import sys
 import atexit
+import time
+import numpy as np
+from physics import PhysicsWorld, PhysicsSettings
+from renderers import WindowRenderer, OverlayRenderer, WINDOW_PADDING
+from clock import SimulationClock, TICK
+from audio import AudioWorker
+from sprites import SpriteCache
+from assets import AssetLibrary
+from storage import BlobCache
+from effects import IMPACT_FRAME_TICKS
+from images import ImageLoader, Animation, DEFAULT_FRAME_MS, decode_image
+from animation import FrameScheduler
+from session import save_session, load_session, SESSION_NAME, PET_COLUMNS
+from desktop import WindowWatcher, default_window_provider
+from monitors import MonitorWatcher, default_monitor_provider
+
+# Delay between drawn frames; physics runs on its own fixed tick (see clock.py)
+FRAME_INTERVAL_MS = 16
+
+# How often the Tk thread picks up the window list found by the watcher thread
+WINDOW_POLL_MS = 250
+
+# How often the Tk thread picks up a monitor layout found by the watcher
+# thread; Windows doesn't always tell Tk when a monitor is added or moved
+MONITOR_POLL_MS = 500
+
+# Tk variables saved with the session
+SESSION_VARIABLES = (
+    "gravity_enabled", "gravity_strength", "friction_enabled", "friction_strength",
+    "bounce_enabled", "bounce_strength", "size_scale", "sound_enabled", "multi_monitor",
+    "collision_enabled", "vertical_boundary_enabled", "overlay_mode", "warp_enabled",
+    "window_obstacles",
+)
 
 class EnhancedPet:
-    def __init__(self, root):
+    def __init__(self, root, use_session=True):
         self.root = root
         self.root.title("Plinko Pets - Atago66 on GitHub")
         self.root.geometry("550x650")
@@ -22,21 +54,23 @@ class EnhancedPet:
         # Flag to track if application is running or shutting down
         self.is_running = True
         
+        # Flag to track if the animation loop is scheduled
+        self.animating = False
+        
+        # Flag to track if the Active Pets list needs rebuilding
+        self.pets_list_dirty = False
+        
         # Store image references to prevent garbage collection
         self.image_references = {}
         
-        # Initialize pygame for sound
-        try:
-            pygame.mixer.init()
-            self.sound_init_success = True
-        except Exception as e:
-            print(f"Sound initialization error: {e}")
-            self.sound_init_success = False
+        # Scaled sprites, decoded images and tones from earlier runs
+        self.disk_cache = None
+        
+        # Pets and settings are saved here on exit and restored on startup
+        self.session_path = None
         
-        # Load or create default sounds
-        self.bounce_sounds = []
         try:
-            # Default bounce sound - create a temporary file if running as executable
+            # Data lives next to the script, or inside the bundle when frozen
             if getattr(sys, 'frozen', False):
                 # We're running in a bundle
                 bundle_dir = sys._MEIPASS
@@ -44,25 +78,50 @@ class EnhancedPet:
                 # We're running in a normal Python environment
                 bundle_dir = os.path.dirname(os.path.abspath(__file__))
                 
-            # Create sound directory if it doesn't exist
+            # Bounce tones are synthesized now, so nothing writes to sounds/;
+            # it is still created because it is where existing installs keep
+            # their own sound files, and cache/ is laid out beside it
             sound_dir = os.path.join(bundle_dir, "sounds")
             if not os.path.exists(sound_dir):
                 os.makedirs(sound_dir)
                 
-            # Try to load built-in sounds or use fallback tones
-            self.create_default_sounds()
+            # The disk cache lives beside it
+            self.disk_cache = BlobCache(os.path.join(bundle_dir, "cache"))
+            if use_session:
+                self.session_path = os.path.join(bundle_dir, SESSION_NAME)
         except Exception as e:
-            print(f"Sound initialization error: {e}")
-            # We'll create simple sounds later if needed
+            # Run without the disk cache and session rather than not at all
+            print(f"Error setting up the data directory: {e}")
+        
+        # Sound runs on its own thread, which initializes pygame's mixer and
+        # synthesizes the default bounce tones
+        self.audio = AudioWorker(self.disk_cache)
+        self.audio.start()
         
         # Pet variables
-        self.pet_images = []  # List of loaded pet images
-        self.pet_windows = []  # List of active pet windows
-        self.pet_sprites = []  # List to store canvas image references
-        self.pet_velocities = []  # List to store velocities for each pet
-        self.pet_is_dragging = []  # List to track dragging state
-        self.pet_offset = []  # List to store drag offsets
-        self.last_positions = []  # Store last positions for velocity calculation
+        self.pets = {}  # Sprite for each pet, keyed by the pet's stable id
+        
+        # Scaled pet images, shared by every pet launched from the same image at the same size
+        self.sprites = SpriteCache(disk=self.disk_cache)
+        
+        # Every image uploaded this session, so pets of different kinds can be launched
+        self.assets = AssetLibrary(self.sprites, disk=self.disk_cache)
+        self.polling_sprite_frames = False
+        
+        # Uploaded images are decoded on a worker thread; only the latest upload is used
+        self.image_loader = ImageLoader()
+        self.image_load_future = None
+        
+        # Pets showing impact frames: pet_id -> [ticks since impact, frame shown]
+        self.warping = {}
+        
+        # Advances every animated (GIF / sprite sheet) pet from the animation loop
+        self.frame_scheduler = FrameScheduler()
+        
+        # Simulation state (positions, velocities, sizes, flags) lives in the physics world arrays
+        self.world = PhysicsWorld(self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        self.clock = SimulationClock()
+        self.last_drag_time = 0.0  # perf_counter of the previous drag event
         
         # Physics settings (with defaults)
         self.gravity_enabled = tk.BooleanVar(value=True)
@@ -76,67 +135,315 @@ class EnhancedPet:
         self.multi_monitor = tk.BooleanVar(value=False)
         self.collision_enabled = tk.BooleanVar(value=True)
         self.vertical_boundary_enabled = tk.BooleanVar(value=True)
+        self.overlay_mode = tk.BooleanVar(value=False)
+        self.warp_enabled = tk.BooleanVar(value=True)
+        self.window_obstacles = tk.BooleanVar(value=False)
+        
+        # Draws the pets: one window per pet, or a single shared overlay
+        self.renderer = WindowRenderer(self.root, self)
+        self.overlay_mode.trace_add("write", self.on_render_mode_change)
+        
+        # The animation loop reads this snapshot instead of the Tk variables;
+        # it is rebuilt (and resting pets woken) whenever one of them changes
+        self.physics_settings = self.read_physics_settings()
+        for var in (self.gravity_enabled, self.gravity_strength, self.friction_enabled,
+                    self.friction_strength, self.bounce_enabled, self.bounce_strength,
+                    self.collision_enabled):
+            var.trace_add("write", self.on_physics_setting_change)
+        
+        # The audio thread reads a plain flag instead of the Tk variable
+        self.sound_enabled.trace_add("write", lambda *args: self.audio.set_enabled(self.sound_enabled.get()))
+        
+        # Same for the impact effect, read every frame
+        self.warp_on = self.warp_enabled.get()
+        self.warp_enabled.trace_add("write", self.on_warp_change)
+        
+        # Monitor rectangles for multi-monitor mode, listed on a background
+        # thread while it is on, never from the animation loop
+        self.monitor_provider = default_monitor_provider()
+        self.monitor_watcher = None
+        self.multi_monitor.trace_add("write", self.on_multi_monitor_change)
+        
+        # Other windows pets can land on, listed on a background thread
+        self.window_watcher = None
+        self.window_obstacles.trace_add("write", self.on_window_obstacles_change)
+        
+        # Screen size is cached in the world and only re-read when the display may have changed
+        self.root.bind("<Configure>", self.on_display_change, add="+")
         
         # Flag to indicate if any pet has been loaded yet
         self.has_active_image = False
+        self.active_asset = None
         
         # Create UI
         self.create_ui()
+        
+        # Bring back the previous run's pets
+        if self.session_path:
+            self.restore_session()
     
     def on_root_close(self):
         """Handle root window closing properly"""
+        self.save_session()
         self.is_running = False
         self.remove_all_pets()
         self.root.destroy()
     
+    def save_session(self):
+        """Write the settings and every pet to the session file"""
+        if self.session_path is None:
+            return
+            
+        assets = {}
+        pets = []
+        world = self.world
+        for pet_id, pet in self.pets.items():
+            source_key, scale, _ = pet['sprite'].key
+            row = world.index_of(pet_id)
+            x, y = world.pos[row].tolist()
+            vx, vy = world.vel[row].tolist()
+            pets.append([source_key, scale, round(x, 1), round(y, 1), round(vx, 2), round(vy, 2),
+                         bool(world.asleep[row])])
+            assets[source_key] = None
+        
+        if self.active_asset is not None:
+            assets[self.active_asset.key] = None
+        for key in assets:
+            asset = self.assets.find_key(key)
+            assets[key] = {'name': asset.name, 'path': asset.path} if asset else {}
+        
+        save_session(self.session_path, {
+            'settings': {name: getattr(self, name).get() for name in SESSION_VARIABLES},
+            'selected': self.active_asset.key if self.active_asset else None,
+            'assets': assets,
+            'pets': pets,
+        })
+    
+    def restore_session(self):
+        """Recreate the saved settings and pets in one batch"""
+        session = load_session(self.session_path)
+        if session is None:
+            return
+            
+        for name, value in session.get('settings', {}).items():
+            if name in SESSION_VARIABLES:
+                try:
+                    getattr(self, name).set(value)
+                except tk.TclError:
+                    pass
+        
+        # Images come back from the disk cache, or failing that their original file
+        assets = {}
+        for key, info in session.get('assets', {}).items():
+            asset = self.assets.restore(key)
+            if asset is None and info.get('path') and os.path.exists(info['path']):
+                try:
+                    asset = self.assets.add(info['name'], decode_image(info['path']), info['path'])
+                except Exception as e:
+                    print(f"Error reloading {info['path']}: {e}")
+            if asset is not None:
+                assets[key] = asset
+        
+        selected = assets.get(session.get('selected'))
+        if selected is not None:
+            self.select_asset(selected)
+        
+        restored = 0
+        bounds = self.world.bounds(self.physics_settings)
+        for values in session.get('pets', []):
+            entry = dict(zip(PET_COLUMNS, values))
+            asset = assets.get(entry['asset'])
+            if asset is None:
+                continue
+            try:
+                sprite = self.assets.acquire(asset, entry['scale'])
+                width = sprite.image.width + WINDOW_PADDING
+                height = sprite.image.height + WINDOW_PADDING
+                
+                # The screen may have shrunk (or a monitor gone) since
+                x = min(max(entry['x'], bounds.left), max(bounds.right - width, bounds.left))
+                y = min(max(entry['y'], bounds.top), max(bounds.bottom - height, bounds.top))
+                pet_id = self.add_pet(sprite, x, y, entry['vx'], entry['vy'])
+            except Exception as e:
+                print(f"Error restoring pet: {e}")
+                continue
+            # A clamped pet may now overlap another, and two sleeping pets
+            # are never pushed apart, so only untouched ones go back to sleep
+            if entry['asleep'] and (x, y) == (entry['x'], entry['y']):
+                self.world.asleep[self.world.index_of(pet_id)] = True
+            restored += 1
+        
+        if restored:
+            self.refresh_pets_list()
+            self.poll_sprite_frames()
+            self.ensure_animating()
+            self.status_var.set(f"Restored {restored} pets")
+    
+    def on_render_mode_change(self, *args):
+        """Move every pet to the renderer matching the overlay setting"""
+        if not self.is_running or self.overlay_mode.get() == isinstance(self.renderer, OverlayRenderer):
+            return
+            
+        if self.overlay_mode.get():
+            new_renderer = OverlayRenderer(self.root, self, self.world, self.render_area())
+            if not new_renderer.transparent:
+                # An opaque overlay would cover the desktop and take every click
+                new_renderer.destroy()
+                self.overlay_check.config(state=tk.DISABLED)
+                self.status_var.set("Overlay mode needs transparent windows, which only Windows has")
+                self.overlay_mode.set(False)
+                return
+        else:
+            new_renderer = WindowRenderer(self.root, self)
+        
+        old_renderer = self.renderer
+        self.renderer = new_renderer
+        # Pets start over with their normal image in the new renderer
+        self.warping = {}
+        
+        # Re-add in launch order so newer pets stay on top
+        for pet_id, pet in self.pets.items():
+            row = self.world.index_of(pet_id)
+            x, y = self.world.pos[row].astype(int).tolist()
+            width, height = self.world.size[row].astype(int).tolist()
+            self.renderer.add(pet_id, pet['sprite'].tk_image, x, y, width, height)
+        self.frame_scheduler.invalidate()
+        
+        old_renderer.destroy()
+    
+    def on_physics_setting_change(self, *args):
+        """Refresh the settings snapshot and wake every pet so it reacts"""
+        try:
+            self.physics_settings = self.read_physics_settings()
+        except tk.TclError:
+            # A slider can hold an unparsable value mid-edit; keep the old snapshot
+            return
+        self.world.wake_all()
+        self.ensure_animating()
+    
+    def on_warp_change(self, *args):
+        """Turn the impact effect on or off; pets mid-effect go back to normal"""
+        self.warp_on = self.warp_enabled.get()
+        if not self.warp_on:
+            for pet_id in self.warping:
+                self.renderer.set_image(pet_id, self.pets[pet_id]['sprite'].tk_image)
+                self.frame_scheduler.invalidate(pet_id)
+            self.warping = {}
+    
+    def on_multi_monitor_change(self, *args):
+        if self.is_running and self.multi_monitor.get():
+            if self.monitor_provider is None:
+                self.apply_monitors(self.virtual_root())
+            elif self.monitor_watcher is None:
+                self.monitor_watcher = MonitorWatcher(self.monitor_provider)
+                self.monitor_watcher.start()
+                self.poll_monitors(self.monitor_watcher)
+        elif self.monitor_watcher is not None:
+            self.monitor_watcher.stop()
+            self.monitor_watcher = None
+        # After the layout, so the snapshot and the renderer agree on the bounds
+        self.on_physics_setting_change()
+        if self.is_running:
+            self.renderer.set_area(*self.render_area())
+    
+    def render_area(self):
+        """(left, top, right, bottom) of the area pets are currently kept in"""
+        bounds = self.world.bounds(self.physics_settings)
+        return bounds.left, bounds.top, bounds.right, bounds.bottom
+    
+    def poll_monitors(self, watcher):
+        """Hand a changed monitor layout to the world until `watcher` is stopped"""
+        if not self.is_running or watcher is not self.monitor_watcher:
+            return
+            
+        rects = watcher.take()
+        if rects is not None:
+            self.apply_monitors(rects)
+        self.root.after(MONITOR_POLL_MS, self.poll_monitors, watcher)
+    
+    def virtual_root(self):
+        """Stand-in monitor list where monitors can't be listed: the virtual
+        root at least spans them all"""
+        return [(0, 0, self.root.winfo_vrootwidth(), self.root.winfo_vrootheight())]
+    
+    def apply_monitors(self, rects):
+        """Give the world a new monitor layout for multi-monitor mode"""
+        self.world.set_monitors(rects)
+        if self.physics_settings.multi_monitor:
+            self.renderer.set_area(*self.render_area())
+        self.ensure_animating()
+    
+    def on_window_obstacles_change(self, *args):
+        """Start or stop treating other applications' windows as obstacles"""
+        if not self.is_running:
+            return
+            
+        if self.window_obstacles.get():
+            if self.window_watcher is not None:
+                return
+            provider = default_window_provider()
+            if provider is None:
+                self.status_var.set("Window obstacles need X11 with xprop and xwininfo")
+                self.window_obstacles.set(False)
+                return
+            self.window_watcher = WindowWatcher(provider)
+            self.window_watcher.start()
+            self.poll_windows()
+        elif self.window_watcher is not None:
+            self.window_watcher.stop()
+            self.window_watcher = None
+            self.world.set_obstacles([])
+            self.ensure_animating()
+    
+    def poll_windows(self):
+        """Hand the latest window list to the world; never queries the window system itself"""
+        if not self.is_running or self.window_watcher is None:
+            return
+            
+        rects = self.window_watcher.take()
+        if rects is not None:
+            self.world.set_obstacles(rects)
+            self.ensure_animating()
+        self.root.after(WINDOW_POLL_MS, self.poll_windows)
+    
+    def on_display_change(self, event):
+        """Pick up a new screen size (resolution change, monitor swap)"""
+        if event.widget is not self.root or not self.is_running:
+            return
+            
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        if (screen_width, screen_height) != (self.world.screen_width, self.world.screen_height):
+            self.world.set_screen_size(screen_width, screen_height)
+            if self.multi_monitor.get() and self.monitor_provider is None:
+                self.apply_monitors(self.virtual_root())
+            self.renderer.set_area(*self.render_area())
+            self.ensure_animating()
+    
     def cleanup(self):
         """Clean up resources on exit"""
         try:
-            # Clean up pygame resources
-            if hasattr(self, 'sound_init_success') and self.sound_init_success:
-                pygame.mixer.quit()
+            # Stop the audio thread, which shuts down pygame's mixer
+            if hasattr(self, 'audio'):
+                self.audio.stop()
+            if hasattr(self, 'sprites'):
+                self.sprites.close()
+            if hasattr(self, 'image_loader'):
+                self.image_loader.close()
+            if getattr(self, 'window_watcher', None) is not None:
+                self.window_watcher.stop()
+            if getattr(self, 'monitor_watcher', None) is not None:
+                self.monitor_watcher.stop()
+            # After the audio thread, which may still be writing tones
+            if getattr(self, 'disk_cache', None) is not None:
+                self.disk_cache.close()
         except:
             pass
     
-    def create_default_sounds(self):
-        """Create default bounce sounds using pygame"""
-        # Create a few different bounce sounds with different pitches
-        frequencies = [220, 330, 440, 550]
-        duration = 100  # milliseconds
-        
-        for i, freq in enumerate(frequencies):
-            sound_file = f"sounds/bounce_sound_{i}.wav"
-            
-            if not os.path.exists(sound_file):
-                # Create a simple sine wave sound
-                pygame.mixer.Sound.fadeout = duration
-                sample_rate = 44100
-                samples = int(duration * sample_rate / 1000.0)
-                
-                # Generate a simple sine wave
-                buf = bytearray(samples * 2)  # 16-bit samples
-                for s in range(samples):
-                    t = float(s) / sample_rate
-                    val = int(32767.0 * math.sin(2.0 * math.pi * freq * t) * (1.0 - t / (duration / 1000.0)))
-                    buf[s*2] = val & 0xff
-                    buf[s*2+1] = (val >> 8) & 0xff
-                
-                try:
-                    # Save it as a temporary file
-                    with open(sound_file, 'wb') as f:
-                        f.write(buf)
-                    sound = pygame.mixer.Sound(sound_file)
-                    self.bounce_sounds.append(sound)
-                except Exception as e:
-                    print(f"Error creating sound: {e}")
-            else:
-                # Load existing sound file
-                sound = pygame.mixer.Sound(sound_file)
-                self.bounce_sounds.append(sound)
-    
     def load_custom_sounds(self):
         """Load custom sound files for bounce effects"""
-        if not self.sound_init_success:
+        self.audio.ready.wait(1.0)
+        if not self.audio.available:
             messagebox.showerror("Error", "Sound system not initialized")
             return
             
@@ -146,24 +453,29 @@ class EnhancedPet:
         )
         
         if file_paths:
-            # Clear existing sounds
-            self.bounce_sounds = []
+            # Decoding happens on the audio thread; check back for the result
+            self.status_var.set(f"Loading {len(file_paths)} sound files...")
+            self.poll_sound_load(self.audio.load_files(file_paths))
+    
+    def poll_sound_load(self, future):
+        """Report the outcome of load_custom_sounds once the audio thread is done"""
+        if not self.is_running:
+            return
             
-            # Load new sounds
-            for path in file_paths:
-                try:
-                    sound = pygame.mixer.Sound(path)
-                    self.bounce_sounds.append(sound)
-                    self.status_var.set(f"Loaded sound: {os.path.basename(path)}")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to load sound {os.path.basename(path)}: {str(e)}")
+        if not future.done():
+            self.root.after(50, self.poll_sound_load, future)
+            return
             
-            if self.bounce_sounds:
-                messagebox.showinfo("Success", f"Loaded {len(self.bounce_sounds)} sound files")
-            else:
-                # If all sound loading failed, recreate default sounds
-                self.create_default_sounds()
-                messagebox.showinfo("Info", "Using default sounds")
+        loaded, errors = future.result()
+        for name, error in errors:
+            messagebox.showerror("Error", f"Failed to load sound {name}: {error}")
+        
+        if loaded:
+            self.status_var.set(f"Loaded {loaded} sound files")
+            messagebox.showinfo("Success", f"Loaded {loaded} sound files")
+        else:
+            # If all sound loading failed, the default sounds are restored
+            messagebox.showinfo("Info", "Using default sounds")
     
     def create_ui(self):
         # Create a notebook (tabs)
@@ -193,6 +505,19 @@ class EnhancedPet:
         self.preview_label = tk.Label(self.preview_frame, text="Image Preview", bg="white")
         self.preview_label.pack(fill=tk.BOTH, expand=True)
         
+        # Pick which uploaded image new pets use
+        asset_frame = tk.Frame(main_frame, bg="#f0f0f0")
+        asset_frame.pack(pady=5)
+        
+        asset_label = tk.Label(asset_frame, text="Pet:", bg="#f0f0f0", font=("Arial", 10))
+        asset_label.pack(side=tk.LEFT, padx=5)
+        
+        self.asset_choice = tk.StringVar()
+        self.asset_combo = ttk.Combobox(asset_frame, textvariable=self.asset_choice, state="readonly",
+                                        width=30, postcommand=self.refresh_asset_choices)
+        self.asset_combo.pack(side=tk.LEFT, padx=5)
+        self.asset_combo.bind("<<ComboboxSelected>>", self.on_asset_selected)
+        
         # Upload buttons frame
         upload_frame = tk.Frame(main_frame, bg="#f0f0f0")
         upload_frame.pack(pady=10, fill=tk.X)
@@ -286,6 +611,11 @@ class EnhancedPet:
         size_slider.pack(side=tk.RIGHT, padx=10, fill=tk.X, expand=True)
         
         
+        # Warp effect settings
+        warp_check = tk.Checkbutton(visual_frame, text="Impact warp effect", variable=self.warp_enabled, 
+                                   bg="#f0f0f0", font=("Arial", 10))
+        warp_check.pack(anchor=tk.W, padx=15, pady=5)
+        
         # Sound settings
         sound_check = tk.Checkbutton(visual_frame, text="Bounce sounds", variable=self.sound_enabled, 
                                     bg="#f0f0f0", font=("Arial", 10))
@@ -300,11 +630,21 @@ class EnhancedPet:
                                        variable=self.multi_monitor, bg="#f0f0f0", font=("Arial", 10))
         multimon_check.pack(anchor=tk.W, padx=15, pady=5)
         
+        # Rendering mode
+        self.overlay_check = tk.Checkbutton(other_frame, text="Single overlay window (faster with many pets)",
+                                           variable=self.overlay_mode, bg="#f0f0f0", font=("Arial", 10))
+        self.overlay_check.pack(anchor=tk.W, padx=15, pady=5)
+        
         # Vertical boundary toggle 
         vertical_check = tk.Checkbutton(other_frame, text="Enable vertical boundary (floor)",
                                        variable=self.vertical_boundary_enabled, bg="#f0f0f0", font=("Arial", 10))
         vertical_check.pack(anchor=tk.W, padx=15, pady=5)
         
+        # Other windows as obstacles
+        windows_check = tk.Checkbutton(other_frame, text="Pets land on other windows",
+                                      variable=self.window_obstacles, bg="#f0f0f0", font=("Arial", 10))
+        windows_check.pack(anchor=tk.W, padx=15, pady=5)
+        
         # Collision
         collision_check = tk.Checkbutton(other_frame, text="Enable collisions between pets", 
                                         variable=self.collision_enabled, bg="#f0f0f0", font=("Arial", 10))
@@ -325,34 +665,76 @@ class EnhancedPet:
         )
         
         if file_path:
-            try:
-                image = Image.open(file_path)
+            # Files already in the library are not decoded again
+            asset = self.assets.find_file(file_path)
+            if asset is not None:
+                self.image_load_future = None
+                self.select_asset(asset)
+                self.status_var.set(f"Image loaded: {asset.name}")
+                return
                 
-                # Resize if too large
-                max_size = 200
-                if image.width > max_size or image.height > max_size:
-                    ratio = min(max_size / image.width, max_size / image.height)
-                    new_size = (int(image.width * ratio), int(image.height * ratio))
-                    image = image.resize(new_size, Image.LANCZOS)
-                
-                # Store original image
-                self.active_image = image.copy()
-                self.has_active_image = True
-                
-                # Create a PhotoImage for display
-                self.preview_image = ImageTk.PhotoImage(image)
-                
-                # Update the preview label
-                self.preview_label.config(image=self.preview_image, text="")
-                
-                # Store multiple references to avoid garbage collection
-                self.preview_label.image = self.preview_image
-                self.image_references['preview'] = self.preview_image
-                
-                self.status_var.set(f"Image loaded: {os.path.basename(file_path)}")
-                print(f"Image loaded successfully: {image.width}x{image.height}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load image: {str(e)}")
+            # Decode and shrink on the loader thread so running pets keep moving
+            self.status_var.set(f"Loading image: {os.path.basename(file_path)}...")
+            self.image_load_future = self.image_loader.load(file_path)
+            self.poll_image_load(self.image_load_future, file_path)
+    
+    def poll_image_load(self, future, file_path):
+        """Swap in the uploaded image once the loader thread has decoded it"""
+        if not self.is_running or future is not self.image_load_future:
+            # Closed, or superseded by a newer upload
+            return
+            
+        if not future.done():
+            self.root.after(50, self.poll_image_load, future, file_path)
+            return
+            
+        self.image_load_future = None
+        try:
+            animation = future.result()
+            image = animation.frames[0]
+            
+            # Keep it in the library (with the rest of the frames, if animated) and use it
+            asset = self.assets.add(os.path.basename(file_path), animation, file_path)
+            self.select_asset(asset)
+            
+            self.status_var.set(f"Image loaded: {asset.name}")
+            print(f"Image loaded successfully: {image.width}x{image.height}, {len(animation.frames)} frame(s)")
+        except Exception as e:
+            self.status_var.set("Ready")
+            messagebox.showerror("Error", f"Failed to load image: {str(e)}")
+    
+    def set_active_image(self, image, name="image"):
+        """Add a still PIL image to the library and launch new pets from it"""
+        self.select_asset(self.assets.add(name, Animation([image], [DEFAULT_FRAME_MS])))
+    
+    def select_asset(self, asset):
+        """Make `asset` the image new pets are launched from"""
+        self.active_asset = asset
+        self.assets.select(asset)
+        self.has_active_image = True
+        
+        # Create a PhotoImage for display
+        self.preview_image = ImageTk.PhotoImage(asset.image)
+        
+        # Update the preview label
+        self.preview_label.config(image=self.preview_image, text="")
+        
+        # Store multiple references to avoid garbage collection
+        self.preview_label.image = self.preview_image
+        self.image_references['preview'] = self.preview_image
+        
+        self.refresh_asset_choices()
+        self.asset_choice.set(asset.name)
+    
+    def refresh_asset_choices(self):
+        """List the library's images, most recently used last"""
+        self.asset_combo['values'] = self.assets.names()
+    
+    def on_asset_selected(self, event):
+        asset = self.assets.get(self.asset_choice.get())
+        if asset is not None:
+            self.select_asset(asset)
+            self.status_var.set(f"Launching: {asset.name}")
     
     def launch_pet(self):
         if not self.is_running:
@@ -363,120 +745,84 @@ class EnhancedPet:
             return
         
         try:
-            # Create a copy of the image for this pet instance
-            pet_image = self.active_image.copy()
-            
-            # Apply size scaling if needed
-            if self.size_scale.get() != 1.0:
-                new_width = int(pet_image.width * self.size_scale.get())
-                new_height = int(pet_image.height * self.size_scale.get())
-                pet_image = pet_image.resize((new_width, new_height), Image.LANCZOS)
-            
-            original_image = pet_image.copy()
-            
-            # Add to pet images list
-            self.pet_images.append({
-                'image': pet_image,
-                'original': original_image,
-            })
+            # Scaled image shared with every other pet of this image and size
+            sprite = self.assets.acquire(self.active_asset, self.size_scale.get())
             
-            # Create pet window
-            pet_window = tk.Toplevel(self.root)
-            pet_window.overrideredirect(True)  # No window decorations
-            pet_window.attributes('-topmost', True)  # Stay on top
-            
-            # Configure transparency
-            pet_window.configure(bg='black')
-            pet_window.attributes('-transparentcolor', 'black')
-            
-            # Set window size based on image
-            width = pet_image.width + 20
-            height = pet_image.height + 20
+            # Set pet size based on image
+            width = sprite.image.width + WINDOW_PADDING
+            height = sprite.image.height + WINDOW_PADDING
             
             # Position randomly on screen
-            screen_width = self.root.winfo_screenwidth()
-            screen_height = self.root.winfo_screenheight()
-            x = random.randint(0, screen_width - width)
-            y = random.randint(0, screen_height - height)
-            
-            pet_window.geometry(f"{width}x{height}+{x}+{y}")
-            
-            # Create canvas
-            canvas = tk.Canvas(
-                pet_window,
-                width=width,
-                height=height,
-                bg='black',
-                highlightthickness=0
-            )
-            canvas.pack()
-            
-            # Create PhotoImage and store with unique name
-            window_index = len(self.pet_windows)
-            pet_tk_image = ImageTk.PhotoImage(pet_image)
-            
-            # Store image reference in multiple places
-            unique_key = f"pet_{window_index}"
-            self.image_references[unique_key] = pet_tk_image
-            
-            # Create image on canvas
-            pet_sprite = canvas.create_image(
-                width // 2,
-                height // 2,
-                image=pet_tk_image
-            )
-            
-            # Store reference on window as well
-            pet_window.pet_tk_image = pet_tk_image
+            x = random.randint(0, self.world.screen_width - width)
+            y = random.randint(0, self.world.screen_height - height)
             
             # Initialize velocity
             velocity = [random.uniform(-3, 3), random.uniform(-4, 0)]  # Random initial movement
             
-            # Add to lists
-            self.pet_windows.append(pet_window)
-            self.pet_sprites.append({'canvas': canvas, 'sprite': pet_sprite, 'tk_image': pet_tk_image})
-            self.pet_velocities.append(velocity)
-            self.pet_is_dragging.append(False)
-            self.pet_offset.append((0, 0))
-            self.last_positions.append((x, y))
+            pet_id = self.add_pet(sprite, x, y, velocity[0], velocity[1])
+            self.poll_sprite_frames()
             
             # Update listbox
-            self.pets_listbox.insert(tk.END, f"Pet {window_index + 1}: {width}x{height}")
-            
-            # Bind events (with the window index)
-            canvas.bind("<Button-1>", lambda e, idx=window_index: self.on_click(e, idx))
-            canvas.bind("<B1-Motion>", lambda e, idx=window_index: self.on_drag(e, idx))
-            canvas.bind("<ButtonRelease-1>", lambda e, idx=window_index: self.on_release(e, idx))
-            canvas.bind("<Double-Button-1>", lambda e, idx=window_index: self.on_double_click(e, idx))
-            canvas.bind("<Button-3>", lambda e, idx=window_index: self.on_right_click(e, idx))
+            self.pets_listbox.insert(tk.END, f"Pet {pet_id}: {width}x{height}")
             
-            # If this is the first pet, start animation
-            if len(self.pet_windows) == 1:
-                self.animate()
+            # Start animation if it was idle
+            self.ensure_animating()
             
-            self.status_var.set(f"Pet {window_index + 1} launched!")
-            print(f"Pet window {window_index + 1} created successfully")
+            self.status_var.set(f"Pet {pet_id} launched!")
+            print(f"Pet window {pet_id} created successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create pet: {str(e)}")
     
+    def add_pet(self, sprite, x, y, vx=0.0, vy=0.0):
+        """Simulate and show a pet using an acquired sprite; returns its id"""
+        width = sprite.image.width + WINDOW_PADDING
+        height = sprite.image.height + WINDOW_PADDING
+        
+        # Add to the simulation, then show the pet
+        pet_id = self.world.add_body(x, y, width, height, vx, vy, mask=sprite.mask)
+        try:
+            self.renderer.add(pet_id, sprite.tk_image, x, y, width, height)
+        except Exception:
+            self.world.remove_body(pet_id)
+            self.assets.release(sprite)
+            raise
+        
+        # The sprite cache keeps the PhotoImage alive while a pet holds it
+        self.pets[pet_id] = {'sprite': sprite}
+        self.frame_scheduler.add(pet_id, sprite)
+        
+        # Impact frames are rendered off the Tk thread, once per sprite
+        self.sprites.prepare_frames(sprite)
+        return pet_id
+    
+    def poll_sprite_frames(self):
+        """Pick up impact frames as the background renderer finishes them"""
+        if not self.is_running or self.polling_sprite_frames:
+            return
+            
+        if self.sprites.load_ready_frames():
+            self.polling_sprite_frames = True
+            self.root.after(50, self.resume_sprite_frames)
+    
+    def resume_sprite_frames(self):
+        self.polling_sprite_frames = False
+        self.poll_sprite_frames()
+    
     def remove_all_pets(self):
         """Remove all active pets"""
         if not self.is_running:
             return
             
         try:
-            for pet_window in self.pet_windows:
-                if pet_window.winfo_exists():
-                    pet_window.destroy()
-            
-            # Clear all lists
-            self.pet_windows = []
-            self.pet_sprites = []
-            self.pet_velocities = []
-            self.pet_is_dragging = []
-            self.pet_offset = []
-            self.last_positions = []
-            self.pet_images = []
+            self.renderer.clear()
+            
+            # Clear all pets
+            for pet in self.pets.values():
+                self.assets.release(pet['sprite'])
+            self.pets = {}
+            self.warping = {}
+            self.frame_scheduler.clear()
+            self.world.clear()
             
             # Clear listbox
             self.pets_listbox.delete(0, tk.END)
@@ -484,65 +830,68 @@ class EnhancedPet:
         except Exception as e:
             print(f"Error removing pets: {e}")
     
-    def on_click(self, event, window_index):
+    def on_click(self, event, pet_id):
         """Handle mouse click on a pet"""
-        if not self.is_running or window_index >= len(self.pet_is_dragging):
+        row = self.world.index_of(pet_id)
+        if not self.is_running or row is None:
             return
             
-        self.pet_is_dragging[window_index] = True
-        self.pet_offset[window_index] = (event.x, event.y)
-        self.pet_velocities[window_index] = [0, 0]  # Reset velocity when clicked
+        self.world.wake(row)
+        self.world.dragging[row] = True
+        self.world.drag_offset[row] = (event.x, event.y)
+        self.world.vel[row] = (0, 0)  # Reset velocity when clicked
+        self.last_drag_time = time.perf_counter()
     
-    def on_drag(self, event, window_index):
+    def on_drag(self, event, pet_id):
         """Handle dragging a pet"""
-        if not self.is_running or not self.pet_is_dragging[window_index]:
+        row = self.world.index_of(pet_id)
+        if not self.is_running or row is None or not self.world.dragging[row]:
             return
             
         try:
-            # Get current window position
-            x = self.pet_windows[window_index].winfo_x()
-            y = self.pet_windows[window_index].winfo_y()
+            # Calculate new position from the simulated position
+            x, y = self.world.pos[row]
+            offset_x, offset_y = self.world.drag_offset[row]
+            new_x = int(x) + event.x - int(offset_x)
+            new_y = int(y) + event.y - int(offset_y)
             
-            # Calculate new position
-            offset_x, offset_y = self.pet_offset[window_index]
-            new_x = x + event.x - offset_x
-            new_y = y + event.y - offset_y
+            # Update pet position on screen
+            self.renderer.move(pet_id, new_x, new_y)
             
-            # Update window position
-            self.pet_windows[window_index].geometry(f"+{new_x}+{new_y}")
-            
-            # Store positions for velocity calculation
-            last_x, last_y = self.last_positions[window_index]
-            
-            # Calculate velocity
-            self.pet_velocities[window_index][0] = new_x - last_x
-            self.pet_velocities[window_index][1] = new_y - last_y
-            
-            # Update last position
-            self.last_positions[window_index] = (new_x, new_y)
+            # Velocity is the distance moved since the last drag event, in pixels per tick
+            now = time.perf_counter()
+            # (floored so back-to-back events can't blow up the estimate)
+            ticks = max((now - self.last_drag_time) / TICK, 0.25)
+            self.last_drag_time = now
+            self.world.vel[row] = ((new_x, new_y) - self.world.pos[row]) / ticks
+            self.world.move_body(row, new_x, new_y)
         except Exception as e:
             print(f"Error during drag: {e}")
     
-    def on_release(self, event, window_index):
+    def on_release(self, event, pet_id):
         """Handle mouse release on a pet"""
-        if not self.is_running or window_index >= len(self.pet_is_dragging):
+        row = self.world.index_of(pet_id)
+        if not self.is_running or row is None:
             return
             
-        if self.pet_is_dragging[window_index]:
-            self.pet_is_dragging[window_index] = False
+        if self.world.dragging[row]:
+            self.world.dragging[row] = False
             
             # Amplify velocity on release for throwing effect
-            self.pet_velocities[window_index][0] *= 5
-            self.pet_velocities[window_index][1] *= 5
+            self.world.vel[row] *= 5
+            self.ensure_animating()
     
-    def on_double_click(self, event, window_index):
+    def on_double_click(self, event, pet_id):
         """Handle double click - make the pet jump"""
-        if not self.is_running or window_index >= len(self.pet_velocities):
+        row = self.world.index_of(pet_id)
+        if not self.is_running or row is None:
             return
             
-        self.pet_velocities[window_index][1] = -20  # Big upward jump
+        self.world.wake(row)
+        self.world.vel[row, 1] = -20  # Big upward jump
+        self.ensure_animating()
     
-    def on_right_click(self, event, window_index):
+    def on_right_click(self, event, pet_id):
         """Display context menu"""
         if not self.is_running:
             return
@@ -551,265 +900,182 @@ class EnhancedPet:
         
         # Add menu items
         menu.add_command(label="Remove This Pet", 
-                         command=lambda: self.remove_pet(window_index))
+                         command=lambda: self.remove_pet(pet_id))
         menu.add_command(label="Throw Around", 
-                         command=lambda: self.throw_pet(window_index))
+                         command=lambda: self.throw_pet(pet_id))
         menu.add_separator()
         menu.add_command(label="Adjust Settings", command=self.root.lift)
         
         # Display menu at mouse position
         menu.post(event.x_root, event.y_root)
     
-    def remove_pet(self, window_index):
+    def remove_pet(self, pet_id):
         """Remove a specific pet"""
-        if not self.is_running:
+        if not self.is_running or pet_id not in self.pets:
             return
             
-        if window_index < len(self.pet_windows) and self.pet_windows[window_index].winfo_exists():
-            self.pet_windows[window_index].destroy()
-            self.status_var.set(f"Pet {window_index + 1} removed")
-            
-            # Mark as removed (will clean up later in animate())
-            self.pet_velocities[window_index] = None
+        # Pets resting on this one should fall
+        self.world.wake_stacked_on(self.world.index_of(pet_id))
+        
+        pet = self.pets.pop(pet_id)
+        self.warping.pop(pet_id, None)
+        self.frame_scheduler.remove(pet_id)
+        self.renderer.remove(pet_id)
+        self.assets.release(pet['sprite'])
+        self.world.remove_body(pet_id)
+        self.mark_pets_list_dirty()
+        self.ensure_animating()
+        self.status_var.set(f"Pet {pet_id} removed")
     
-    def throw_pet(self, window_index):
+    def throw_pet(self, pet_id):
         """Apply random velocity to throw the pet"""
-        if not self.is_running or window_index >= len(self.pet_velocities):
+        row = self.world.index_of(pet_id)
+        if not self.is_running or row is None:
             return
             
-        self.pet_velocities[window_index][0] = random.randint(-30, 30)
-        self.pet_velocities[window_index][1] = random.randint(-35, -15)
+        self.world.wake(row)
+        self.world.vel[row] = (random.randint(-30, 30), random.randint(-35, -15))
+        self.ensure_animating()
     
-    def play_bounce_sound(self):
-        """Play a random bounce sound if sounds are enabled"""
-        if not self.is_running or not self.sound_enabled.get() or not self.bounce_sounds or not self.sound_init_success:
+    def play_bounce_sound(self, width=0, speed=0.0):
+        """Hand an impact to the audio thread; it decides what is heard"""
+        if self.is_running:
+            self.audio.impact(width, speed)
+    
+    def read_physics_settings(self):
+        """Snapshot the physics options from the Tk variables"""
+        return PhysicsSettings(
+            gravity_enabled=self.gravity_enabled.get(),
+            gravity_strength=self.gravity_strength.get(),
+            friction_enabled=self.friction_enabled.get(),
+            friction_strength=self.friction_strength.get(),
+            bounce_enabled=self.bounce_enabled.get(),
+            bounce_strength=self.bounce_strength.get(),
+            multi_monitor=self.multi_monitor.get(),
+            collision_enabled=self.collision_enabled.get(),
+        )
+    
+    def mark_pets_list_dirty(self):
+        """Schedule one rebuild of the Active Pets list when Tk is idle"""
+        if self.pets_list_dirty:
             return
             
-        # Choose a random sound and play it
-        sound = random.choice(self.bounce_sounds)
-        try:
-            sound.play()
-        except Exception as e:
-            print(f"Error playing sound: {e}")
-            # Disable sound on error to prevent further errors
-            self.sound_enabled.set(False)
+        self.pets_list_dirty = True
+        self.root.after_idle(self.refresh_pets_list)
     
-    def check_pet_collision(self, i, j):
-        """Check if two pets are colliding and handle the collision"""
+    def refresh_pets_list(self):
+        """Rebuild the Active Pets list from the world"""
+        self.pets_list_dirty = False
         if not self.is_running:
-            return False
-            
-        if i == j or not self.collision_enabled.get():
-            return False
-            
-        # Get pet positions and dimensions
-        try:
-            w1 = self.pet_windows[i]
-            w2 = self.pet_windows[j]
-            
-            # Get positions
-            x1, y1 = w1.winfo_x(), w1.winfo_y()
-            x2, y2 = w2.winfo_x(), w2.winfo_y()
-            
-            # Get dimensions
-            width1, height1 = w1.winfo_width(), w1.winfo_height()
-            width2, height2 = w2.winfo_width(), w2.winfo_height()
-            
-            # Calculate centers
-            c1x, c1y = x1 + width1 // 2, y1 + height1 // 2
-            c2x, c2y = x2 + width2 // 2, y2 + height2 // 2
-            
-            # Calculate distance between centers
-            distance = math.sqrt((c1x - c2x) ** 2 + (c1y - c2y) ** 2)
-            
-            # Calculate minimum distance for collision
-            min_distance = (width1 + width2) // 4  # Adjust for more natural collisions
+            return
             
-            if distance < min_distance:
-                # Collision detected!
-                # Calculate angle of collision
-                angle = math.atan2(c2y - c1y, c2x - c1x)
-                
-                # Exchange momentum (simplified physics)
-                v1x, v1y = self.pet_velocities[i]
-                v2x, v2y = self.pet_velocities[j]
-                
-                # Calculate new velocities (simplified elastic collision)
-                temp_v1x = v2x * 0.8
-                temp_v1y = v2y * 0.8
-                temp_v2x = v1x * 0.8
-                temp_v2y = v1y * 0.8
-                
-                self.pet_velocities[i][0] = temp_v1x
-                self.pet_velocities[i][1] = temp_v1y
-                self.pet_velocities[j][0] = temp_v2x
-                self.pet_velocities[j][1] = temp_v2y
-                
-                # Add a little push to separate them
-                push_x = math.cos(angle) * 30
-                push_y = math.sin(angle) * 30
-                
-                self.pet_velocities[i][0] -= push_x
-                self.pet_velocities[i][1] -= push_y
-                self.pet_velocities[j][0] += push_x
-                self.pet_velocities[j][1] += push_y
-                
-                # Play sound
-                if self.sound_enabled.get():
-                    self.play_bounce_sound()
-                
-                return True
+        self.pets_listbox.delete(0, tk.END)
+        for pet_id in self.pets:
+            width, height = self.world.size[self.world.index_of(pet_id)].astype(int).tolist()
+            self.pets_listbox.insert(tk.END, f"Pet {pet_id}: {width}x{height}")
+    
+    def ensure_animating(self):
+        """Restart the animation loop if it went idle"""
+        if self.animating or not self.is_running or self.world.count == 0:
+            return
             
-            return False
-        except Exception as e:
-            # Skip collision detection if windows no longer exist
-            return False
+        self.animating = True
+        self.clock.reset()
+        self.animate()
     
     def animate(self):
         """Main animation loop"""
         if not self.is_running:
+            self.animating = False
             return
             
-        # Process each pet
-        active_pets = False
-        
-        for i in range(len(self.pet_windows)):
-            # Skip if this pet has been removed
-            if self.pet_velocities[i] is None:
-                continue
-                
-            # Skip if window no longer exists
-            if not self.pet_windows[i].winfo_exists():
-                self.pet_velocities[i] = None
-                continue
-                
-            active_pets = True
-            
-            # Skip if being dragged
-            if self.pet_is_dragging[i]:
-                continue
-            
-            try:
-                # Get current position
-                x = self.pet_windows[i].winfo_x()
-                y = self.pet_windows[i].winfo_y()
-                width = self.pet_windows[i].winfo_width()
-                height = self.pet_windows[i].winfo_height()
-                
-                # Apply physics if enabled
-                if self.gravity_enabled.get():
-                    # Apply gravity
-                    self.pet_velocities[i][1] += self.gravity_strength.get()
-                
-                if self.friction_enabled.get():
-                    # Apply friction/air resistance
-                    self.pet_velocities[i][0] *= self.friction_strength.get()
-                    self.pet_velocities[i][1] *= self.friction_strength.get()
-                
-                # Store velocity before bounce for sound threshold check
-                vel_before_bounce = self.pet_velocities[i].copy()
-                
-                # Update position
-                new_x = x + self.pet_velocities[i][0]
-                new_y = y + self.pet_velocities[i][1]
-                
-                # Check screen boundaries
-                screen_width = self.root.winfo_screenwidth()
-                screen_height = self.root.winfo_screenheight()
-                
-                # Flag to track if a significant bounce occurred
-                significant_bounce = False
-                
-                # Handle horizontal boundaries
-                if new_x < 0:
-                    new_x = 0
-                    self.pet_velocities[i][0] *= -self.bounce_strength.get()
-                    # Check if horizontal velocity is significant
-                    if abs(vel_before_bounce[0]) > 2.0:
-                        significant_bounce = True
-                elif new_x > screen_width - width and not self.multi_monitor.get():
-                    new_x = screen_width - width
-                    self.pet_velocities[i][0] *= -self.bounce_strength.get()
-                    # Check if horizontal velocity is significant
-                    if abs(vel_before_bounce[0]) > 2.0:
-                        significant_bounce = True
-                
-            
-                # Handle vertical boundaries
-                if new_y < 0:
-                    new_y = 0
-                    self.pet_velocities[i][1] *= -self.bounce_strength.get()
-                    # Check if vertical velocity is significant
-                    if abs(vel_before_bounce[1]) > 2.0:
-                        significant_bounce = True
-                elif new_y > screen_height - height:
-                    new_y = screen_height - height
-                    self.pet_velocities[i][1] *= -self.bounce_strength.get()
-                    # Check if vertical velocity is significant
-                    if abs(vel_before_bounce[1]) > 2.0:
-                        significant_bounce = True
-                
-                # Only play sound if bounce is significant and bounce sound is enabled
-                if significant_bounce and self.bounce_enabled.get():
-                    self.play_bounce_sound()
-                
-                # Update window position
-                self.pet_windows[i].geometry(f"+{int(new_x)}+{int(new_y)}")
-                
-                # Update last position
-                self.last_positions[i] = (new_x, new_y)
-                
-                # Check collisions with other pets
-                for j in range(len(self.pet_windows)):
-                    if self.pet_velocities[j] is not None:
-                        self.check_pet_collision(i, j)
-            except Exception as e:
-                print(f"Error during animation: {e}")
-        
-        # Clean up removed pet windows
-        if len(self.pet_windows) > 0:
-            # Remove references to destroyed windows
-            new_windows = []
-            new_sprites = []
-            new_velocities = []
-            new_dragging = []
-            new_offset = []
-            new_positions = []
-            new_images = []
-            
-            for i in range(len(self.pet_windows)):
-                if self.pet_velocities[i] is not None:
-                    new_windows.append(self.pet_windows[i])
-                    new_sprites.append(self.pet_sprites[i])
-                    new_velocities.append(self.pet_velocities[i])
-                    new_dragging.append(self.pet_is_dragging[i])
-                    new_offset.append(self.pet_offset[i])
-                    new_positions.append(self.last_positions[i])
-                    new_images.append(self.pet_images[i])
-            
-            # Update lists
-            self.pet_windows = new_windows
-            self.pet_sprites = new_sprites
-            self.pet_velocities = new_velocities
-            self.pet_is_dragging = new_dragging
-            self.pet_offset = new_offset
-            self.last_positions = new_positions
-            self.pet_images = new_images
-            
-            # Update listbox
-            self.pets_listbox.delete(0, tk.END)
-            for i in range(len(self.pet_windows)):
-                width = self.pet_windows[i].winfo_width()
-                height = self.pet_windows[i].winfo_height()
-                self.pets_listbox.insert(tk.END, f"Pet {i + 1}: {width}x{height}")
+        active_pets = self.run_frame()
         
         # Continue animation if there are active pets and the application is running
         if active_pets and self.is_running:
-            # Schedule the next animation frame (reduced to 15ms for smoother animation, physics depends on this)
-            self.root.after(15, self.animate)
+            # Schedule the next frame; physics speed no longer depends on this delay
+            self.root.after(FRAME_INTERVAL_MS, self.animate)
         else:
-            # No active pets, stop animation loop
+            # Every pet is gone or asleep, stop animation loop until something wakes one
+            self.animating = False
+            self.audio.flush()
             print("Animation stopped - no active pets")
+    
+    def run_frame(self):
+        """Simulate and draw one frame; returns True while some pet can still move"""
+        # Pets that are neither held nor asleep are the only ones that can move
+        moving = np.flatnonzero(~(self.world.dragging | self.world.asleep))
+        
+        # Run however many fixed ticks have elapsed, without touching any window
+        settings = self.physics_settings
+        impacts = []
+        ticks = self.clock.advance()
+        # With every pet at rest (only animations running) a step would change nothing
+        if not self.world.all_asleep():
+            for _ in range(ticks):
+                impacts.extend(self.world.step(settings))
+        
+        # Play a sound for every wall bounce or pet collision
+        if impacts:
+            widths = self.world.size[:, 0]
+            for impact in impacts:
+                self.play_bounce_sound(widths[impact.body], impact.speed)
+        
+        # Squash pets that just hit something, using their precomputed frames
+        if self.warp_on and (impacts or self.warping):
+            self.update_warps(impacts, ticks)
+        
+        # Advance GIF / sprite-sheet pets by the simulated time, leaving warped ones be
+        if self.frame_scheduler:
+            self.frame_scheduler.advance(ticks * TICK * 1000, self.renderer, self.warping)
+        
+        # Push positions to the screen, interpolated between the last two ticks
+        positions = self.world.interpolate(self.clock.alpha)[moving].astype(int).tolist()
+        destroyed = self.renderer.render(self.world.ids[moving].tolist(), positions)
+        
+        # Forget pets whose window was destroyed outside of remove_pet
+        for pet_id in destroyed:
+            self.assets.release(self.pets.pop(pet_id)['sprite'])
+            self.warping.pop(pet_id, None)
+            self.frame_scheduler.remove(pet_id)
+            self.world.remove_body(pet_id)
+        
+        if destroyed:
+            self.mark_pets_list_dirty()
+        
+        # Keep going while some pet can still move, is mid-effect or is animated
+        return self.world.count > 0 and (not self.world.all_asleep() or bool(self.warping)
+                                         or bool(self.frame_scheduler))
+    
+    def update_warps(self, impacts, ticks):
+        """Start the impact animation for pets that were hit and advance running ones"""
+        ids = self.world.ids
+        for impact in impacts:
+            for row in (impact.body, impact.other):
+                if row is None:
+                    continue
+                pet_id = int(ids[row])
+                # Pets already mid-effect carry on; frames may still be rendering
+                if pet_id not in self.warping and self.pets[pet_id]['sprite'].impact_frames:
+                    self.warping[pet_id] = [-ticks, None]
+        
+        finished = []
+        for pet_id, state in self.warping.items():
+            state[0] += ticks
+            frames = self.pets[pet_id]['sprite'].impact_frames
+            frame = state[0] // IMPACT_FRAME_TICKS
+            if frame >= len(frames):
+                finished.append(pet_id)
+            elif frame != state[1]:
+                # Only talk to Tk when the picture actually changes
+                self.renderer.set_image(pet_id, frames[frame])
+                state[1] = frame
+        
+        for pet_id in finished:
+            del self.warping[pet_id]
+            self.renderer.set_image(pet_id, self.pets[pet_id]['sprite'].tk_image)
+            # Animated pets pick up their current frame again
+            self.frame_scheduler.invalidate(pet_id)
 
 def safe_start():
     try:
@@ -0,0 +1,184 @@
+"""Monitor geometry for multi-monitor mode.
+
+A MonitorProvider lists the monitors as screen rectangles (left, top,
+right, bottom): xrandr's outputs on X11, each monitor's work area (the
+screen minus the taskbar) on Windows. Running xrandr takes a process, so
+MonitorWatcher re-lists them on its own thread and the Tk thread only
+takes the result. MonitorLayout turns such a list into
+per-column tables of where each pixel column's floor, ceiling and walls
+are, so the physics finds a pet's boundaries with a few array lookups no
+matter how many monitors there are or how their sizes differ.
+
+FakeMonitorProvider serves a fixed list instead, so the layout can be
+checked without a display (see tests/test_monitors.py).
+"""
+import re
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+from desktop import WindowWatcher
+
+# Longest the xrandr call may take
+QUERY_TIMEOUT = 2.0
+
+# Seconds between monitor list refreshes; backs off while nothing changes
+REFRESH_SECONDS = 1.0
+SLOWEST_REFRESH_SECONDS = 8.0
+
+# "HDMI-1 connected primary 1920x1080+0+0 ..." lines of xrandr output
+XRANDR_OUTPUT = re.compile(r"^\S+ connected (?:primary )?(\d+)x(\d+)\+(-?\d+)\+(-?\d+)", re.MULTILINE)
+
+
+class MonitorProvider:
+    """Lists the monitors of the desktop"""
+
+    def monitors(self):
+        """Return a list of (left, top, right, bottom) screen rectangles; may raise"""
+        raise NotImplementedError
+
+
+class FakeMonitorProvider(MonitorProvider):
+    """Serves whatever rectangles it is given"""
+
+    def __init__(self, rects=()):
+        self.rects = list(rects)
+
+    def monitors(self):
+        return list(self.rects)
+
+
+class XrandrMonitorProvider(MonitorProvider):
+    """Active outputs as reported by xrandr"""
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and shutil.which("xrandr") is not None
+
+    def monitors(self):
+        # --current reports the known configuration without re-probing every output
+        output = subprocess.run(["xrandr", "--current"], capture_output=True, text=True, check=True,
+                                timeout=QUERY_TIMEOUT).stdout
+        rects = []
+        for width, height, left, top in XRANDR_OUTPUT.findall(output):
+            left, top = int(left), int(top)
+            rects.append((left, top, left + int(width), top + int(height)))
+        return rects
+
+
+class Win32MonitorProvider(MonitorProvider):
+    """Work area of every monitor, from EnumDisplayMonitors"""
+
+    @staticmethod
+    def available():
+        return sys.platform == "win32"
+
+    def monitors(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+        user32 = ctypes.windll.user32
+        rects = []
+
+        def add_monitor(monitor, dc, rect, data):
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            if user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+                work = info.rcWork
+                rects.append((work.left, work.top, work.right, work.bottom))
+            return True
+
+        callback_type = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HANDLE, wintypes.HDC,
+                                           ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+        user32.EnumDisplayMonitors(None, None, callback_type(add_monitor), 0)
+        return rects
+
+
+def default_monitor_provider():
+    """The provider for this desktop, or None if monitors can't be listed here"""
+    for provider in (XrandrMonitorProvider, Win32MonitorProvider):
+        if provider.available():
+            return provider()
+    return None
+
+
+class MonitorWatcher(WindowWatcher):
+    """Background thread that re-lists the monitors, like WindowWatcher does
+    the windows; take() returns the new list after a change"""
+
+    listing = "monitors"
+
+    def __init__(self, provider, interval=REFRESH_SECONDS, slowest_interval=SLOWEST_REFRESH_SECONDS):
+        super().__init__(provider, interval, slowest_interval)
+
+    def _list(self):
+        return self.provider.monitors()
+
+
+class MonitorLayout:
+    """Floors, ceilings and walls of the area a set of monitors covers.
+
+    Column k + 1 of each table describes screen x = left + k; columns 0 and
+    width + 1 stand for everything off the left and right of the desktop.
+        covered     some monitor shows this column
+        ceiling     top of the monitors here (inf where uncovered)
+        floor       bottom of the monitors here (-inf where uncovered)
+        land_*      the same, taken from the nearest covered column where
+                    uncovered, so a pet over a gap still has a floor
+        run_start   screen x where this column's stretch of identical
+                    columns begins, i.e. the wall a pet moving right meets
+        run_end     screen x just past the stretch, the wall for moving left
+    """
+
+    def __init__(self, rects):
+        rects = np.asarray(rects, dtype=int).reshape(-1, 4)
+        rects = rects[(rects[:, 2] > rects[:, 0]) & (rects[:, 3] > rects[:, 1])]
+        if len(rects) == 0:
+            raise ValueError("no monitors")
+        self.rects = rects
+        self.left, self.top = rects[:, :2].min(axis=0).tolist()
+        self.right, self.bottom = rects[:, 2:].max(axis=0).tolist()
+        width = self.right - self.left
+
+        ceiling = np.full(width + 2, np.inf)
+        floor = np.full(width + 2, -np.inf)
+        for left, top, right, bottom in rects.tolist():
+            columns = slice(left - self.left + 1, right - self.left + 1)
+            ceiling[columns] = np.minimum(ceiling[columns], top)
+            floor[columns] = np.maximum(floor[columns], bottom)
+        self.ceiling = ceiling
+        self.floor = floor
+        self.covered = floor > ceiling
+
+        # Uncovered columns borrow from the nearest covered one
+        covered = np.flatnonzero(self.covered)
+        index = np.arange(width + 2)
+        after = np.minimum(np.searchsorted(covered, index), len(covered) - 1)
+        before = np.maximum(after - 1, 0)
+        nearest = np.where(np.abs(covered[before] - index) < np.abs(covered[after] - index),
+                           covered[before], covered[after])
+        self.land_ceiling = ceiling[nearest]
+        self.land_floor = floor[nearest]
+
+        # Stretches of columns with the same ceiling and floor
+        change = np.flatnonzero((ceiling[1:] != ceiling[:-1]) | (floor[1:] != floor[:-1])) + 1
+        starts = np.concatenate([[0], change])
+        ends = np.concatenate([change, [width + 2]])
+        stretch = np.repeat(np.arange(len(starts)), ends - starts)
+        self.run_start = (starts - 1 + self.left)[stretch]
+        self.run_end = (ends - 1 + self.left)[stretch]
+
+    @classmethod
+    def screen(cls, width, height):
+        """A single monitor at the origin"""
+        return cls([(0, 0, width, height)])
+
+    def column(self, x):
+        """Table column of screen x coordinates"""
+        return np.clip(np.floor(x).astype(int) - self.left + 1, 0, len(self.floor) - 1)
@@ -0,0 +1,826 @@
+"""Headless physics core for Plinko Pets.
+
+The world owns every pet's position, velocity and size, so it can be
+stepped, profiled and tested without a display. The Tk front end in
+main.py only pushes the resulting positions to the pet windows once per
+frame.
+
+State is stored as a struct of NumPy arrays (one row per pet) so gravity,
+friction, integration and wall bounces cost a handful of array operations
+per frame regardless of how many pets are on the desktop.
+
+Collisions use a spatial hash broad phase. Bodies given an AlphaMask
+(see masks.py) collide on their actual opaque pixels; others fall back
+to the original overlapping-circles test. Contacts are resolved with
+impulses: mass comes from the sprite's opaque area, restitution from the
+bounce setting, plus Coulomb friction, iterated over all contacts at once.
+Overlaps left over are pushed apart with the lower pet of a stacked pair
+held still, so piles build upwards, come to rest and can fall asleep.
+Bodies fast enough to pass through another pet within one tick (thrown
+pets) are swept first and stopped at the first pet in their path.
+
+Optional obstacle rectangles (other applications' windows, see desktop.py)
+are kept in a static grid; pets land on their tops and bounce off their
+sides like the screen edges. The edges themselves come from a
+monitors.MonitorLayout: the primary screen, or every monitor in
+multi-monitor mode, so mixed resolutions get their own floors and walls.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from masks import SUPPORT_AXES, SUPPORT_DIRECTIONS
+from monitors import MonitorLayout
+from spatial import RectIndex, SpatialHash
+
+# Minimum speed (pixels per tick) for a wall hit to count as an audible bounce
+BOUNCE_SOUND_THRESHOLD = 2.0
+
+# Solver passes over all contacts per tick
+SOLVER_ITERATIONS = 6
+
+# Pets closing slower than this (pixels per tick) don't bounce, they just stop
+RESTING_SPEED = 1.0
+
+# Friction coefficient between touching pets (when friction is enabled)
+CONTACT_FRICTION = 0.4
+
+# Overlap (pixels) tolerated without correction, fraction of the rest removed
+# per pass, the most any one contact corrects per pass, and passes per tick
+PENETRATION_SLOP = 1.0
+CORRECTION_PERCENT = 0.8
+MAX_CORRECTION = 8.0
+POSITION_ITERATIONS = 4
+
+# Contacts whose normal is steeper than this (sine of the angle from level)
+# count as one pet resting on another
+STACKED = 0.5
+
+# Pets overlapping by more than this (pixels) after correction can't fall asleep
+VISIBLE_OVERLAP = 3.0
+
+# How far (pixels) a fast pet is let into the first pet in its path, so the
+# contact solver sees the hit
+SWEEP_OVERLAP = 2.0
+
+# A resting pet is only woken by something closing faster than this;
+# slower contacts treat it as fixed ground
+WAKE_SPEED = 3.0
+
+# Opaque area that weighs 1 (a 100 x 100 sprite)
+UNIT_AREA = 100 * 100
+
+# Rows allocated up front; storage doubles when it runs out
+INITIAL_CAPACITY = 16
+
+# A body slower than this (pixels per tick) for SLEEP_TICKS ticks is put to sleep
+SLEEP_SPEED = 1.0
+SLEEP_TICKS = 30
+
+# Per-body arrays: name -> (shape of one row, dtype)
+FIELDS = {
+    "ids": ((), int),
+    "pos": ((2,), float),
+    "prev_pos": ((2,), float),
+    "vel": ((2,), float),
+    "size": ((2,), float),
+    "dragging": ((), bool),
+    "drag_offset": ((2,), float),
+    "asleep": ((), bool),
+    "rest_ticks": ((), int),
+    "shape": ((), int),
+    "shape_offset": ((2,), int),
+    "shape_box": ((4,), int),
+    "inv_mass": ((), float),
+}
+
+# An impact the front end may want to react to (sound, effects).
+# `other` is None for wall bounces; `speed` is the pre-impact speed.
+Impact = namedtuple("Impact", ["body", "other", "speed"])
+
+
+# Immutable snapshot of the physics options, read by step() as plain
+# Python values. The front end builds a new one whenever a setting changes.
+PhysicsSettings = namedtuple(
+    "PhysicsSettings",
+    ["gravity_enabled", "gravity_strength", "friction_enabled", "friction_strength",
+     "bounce_enabled", "bounce_strength", "multi_monitor", "collision_enabled"],
+    defaults=[True, 0.7, True, 0.95, True, 0.6, False, True],
+)
+
+
+class PhysicsWorld:
+    """Steps all pet bodies against the screen bounds and each other.
+
+    Each pet gets a stable id when added. Rows are packed: removing a pet
+    moves the last row into its place, so row numbers change but ids don't.
+    slot_of maps id -> row for the event handlers.
+
+    Row i of every array describes one pet:
+        ids          the pet's stable id
+        pos          top-left corner (x, y)
+        prev_pos     pos before the latest step, for render interpolation
+        vel          velocity in pixels per tick
+        size         window size (width, height)
+        dragging     True while the user holds the pet
+        drag_offset  pointer offset inside the pet when the drag started
+        asleep       True once the pet has come to rest; skipped by step()
+        rest_ticks   consecutive ticks spent below SLEEP_SPEED
+        shape        index into `shapes` of the body's AlphaMask, 0 for none
+        shape_offset where the mask's top-left sits inside the body
+        shape_box    the mask's opaque box (left, top, right, bottom) inside the body
+        inv_mass     1 / mass, mass being the opaque area in UNIT_AREAs
+    The public attributes are views trimmed to the live pet count.
+    """
+
+    def __init__(self, screen_width, screen_height, capacity=INITIAL_CAPACITY):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.count = 0
+
+        # Walls and floors: the primary screen, or in multi-monitor mode the
+        # monitors given to set_monitors() (see monitors.py)
+        self.screen = MonitorLayout.screen(screen_width, screen_height)
+        self.monitors = None
+        self.next_id = 1
+        self.slot_of = {}
+        self._allocate(capacity)
+        self.broad_phase = SpatialHash(1)
+
+        # Static rectangles pets land on, e.g. other applications' windows
+        self.obstacles = RectIndex(())
+
+        # Set per step: bodies a contact correction moved noticeably
+        self.pushed = np.zeros(0, dtype=bool)
+
+        # Collision masks by shape index; index 0 means "no mask". Entries
+        # are counted by the bodies using them and freed with the last one,
+        # so sprites evicted from the cache don't keep their masks alive
+        self.shapes = [None]
+        self.shape_users = [0]
+        self.shape_index = {}
+        self.free_shapes = []
+
+        # AlphaMask.support of each shape, for contact depths
+        self.shape_support = np.zeros((1, SUPPORT_DIRECTIONS))
+
+    def _allocate(self, capacity):
+        """(Re)allocate storage, keeping the rows already in use"""
+        for name, (shape, dtype) in FIELDS.items():
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            old = getattr(self, "_" + name, None)
+            if old is not None:
+                array[:self.count] = old[:self.count]
+            setattr(self, "_" + name, array)
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    @property
+    def pos(self):
+        return self._pos[:self.count]
+
+    @property
+    def prev_pos(self):
+        return self._prev_pos[:self.count]
+
+    @property
+    def vel(self):
+        return self._vel[:self.count]
+
+    @property
+    def size(self):
+        return self._size[:self.count]
+
+    @property
+    def dragging(self):
+        return self._dragging[:self.count]
+
+    @property
+    def drag_offset(self):
+        return self._drag_offset[:self.count]
+
+    @property
+    def asleep(self):
+        return self._asleep[:self.count]
+
+    @property
+    def rest_ticks(self):
+        return self._rest_ticks[:self.count]
+
+    @property
+    def shape(self):
+        return self._shape[:self.count]
+
+    @property
+    def shape_offset(self):
+        return self._shape_offset[:self.count]
+
+    @property
+    def shape_box(self):
+        return self._shape_box[:self.count]
+
+    @property
+    def inv_mass(self):
+        return self._inv_mass[:self.count]
+
+    def add_body(self, x, y, width, height, vx=0.0, vy=0.0, mask=None):
+        """Create a body and return its id.
+
+        `mask` is an AlphaMask for pixel-accurate collisions, drawn centred
+        in the body the way the renderers centre the sprite.
+        """
+        if self.count == len(self._pos):
+            self._allocate(len(self._pos) * 2)
+
+        i = self.count
+        for name in FIELDS:
+            getattr(self, "_" + name)[i] = 0
+        self._pos[i] = (x, y)
+        self._prev_pos[i] = (x, y)
+        self._vel[i] = (vx, vy)
+        self._size[i] = (width, height)
+        self._inv_mass[i] = UNIT_AREA / max(width * height, 1)
+        if mask is not None and not mask.empty:
+            self._shape[i] = self._register_shape(mask)
+            offset = (int(width) // 2 - mask.width // 2, int(height) // 2 - mask.height // 2)
+            self._shape_offset[i] = offset
+            left, top, right, bottom = mask.box
+            self._shape_box[i] = (left + offset[0], top + offset[1], right + offset[0], bottom + offset[1])
+            self._inv_mass[i] = UNIT_AREA / mask.area
+
+        pet_id = self.next_id
+        self.next_id += 1
+        self._ids[i] = pet_id
+        self.slot_of[pet_id] = i
+        self.count += 1
+        return pet_id
+
+    def _register_shape(self, mask):
+        """Shape index for a mask; sprites shared by many pets share one entry"""
+        index = self.shape_index.get(id(mask))
+        if index is None:
+            if self.free_shapes:
+                index = self.free_shapes.pop()
+                self.shapes[index] = mask
+                self.shape_support[index] = mask.support
+            else:
+                index = len(self.shapes)
+                self.shapes.append(mask)
+                self.shape_users.append(0)
+                self.shape_support = np.vstack([self.shape_support, mask.support])
+            self.shape_index[id(mask)] = index
+        self.shape_users[index] += 1
+        return index
+
+    def _release_shape(self, index):
+        """Drop one body's use of a shape, freeing the entry with the last one"""
+        self.shape_users[index] -= 1
+        if self.shape_users[index] == 0:
+            del self.shape_index[id(self.shapes[index])]
+            self.shapes[index] = None
+            self.free_shapes.append(index)
+
+    def index_of(self, pet_id):
+        """Row of a pet, or None if it has been removed"""
+        return self.slot_of.get(pet_id)
+
+    def remove_body(self, pet_id):
+        """Delete a body in O(1) by moving the last row into its slot"""
+        row = self.slot_of.pop(pet_id)
+        if self._shape[row]:
+            self._release_shape(int(self._shape[row]))
+        last = self.count - 1
+        if row != last:
+            for name in FIELDS:
+                array = getattr(self, "_" + name)
+                array[row] = array[last]
+            self.slot_of[int(self._ids[row])] = row
+        self.count -= 1
+
+    def clear(self):
+        self.count = 0
+        self.slot_of = {}
+        self.shapes = [None]
+        self.shape_users = [0]
+        self.shape_index = {}
+        self.free_shapes = []
+        self.shape_support = np.zeros((1, SUPPORT_DIRECTIONS))
+
+    def set_screen_size(self, screen_width, screen_height):
+        """Update the walls after a display change and let every pet react"""
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.screen = MonitorLayout.screen(screen_width, screen_height)
+        self.wake_all()
+
+    def set_monitors(self, rects):
+        """Use these monitor rectangles (left, top, right, bottom) as the
+        bounds in multi-monitor mode; an empty list means the screen only"""
+        self.monitors = MonitorLayout(rects) if len(rects) else None
+        self.wake_all()
+
+    def bounds(self, settings):
+        """The MonitorLayout bodies are kept inside"""
+        if settings.multi_monitor and self.monitors is not None:
+            return self.monitors
+        return self.screen
+
+    def set_obstacles(self, rects):
+        """Replace the obstacle rectangles (left, top, right, bottom) and let every pet react"""
+        self.obstacles = RectIndex(rects, margin=self._obstacle_margin())
+        self.wake_all()
+
+    def _obstacle_margin(self):
+        """How near an obstacle a body's center must be to touch it"""
+        return float(self.size.max()) if self.count else 0.0
+
+    def wake(self, index):
+        """Make a sleeping body simulate again"""
+        self._asleep[index] = False
+        self._rest_ticks[index] = 0
+
+    def wake_all(self):
+        self.asleep[:] = False
+        self.rest_ticks[:] = 0
+
+    def wake_stacked_on(self, index):
+        """Wake the bodies resting on this one, directly or on top of others
+        that do, e.g. before removing it so they fall instead of floating.
+
+        Bodies count as touching when their boxes overlap, which takes in
+        everything whose collision shape could rest on the other's.
+        """
+        low, high = self.pos, self.pos + self.size
+        middle = (low[:, 1] + high[:, 1]) / 2
+        stacked = np.zeros(self.count, dtype=bool)
+        stacked[index] = True
+        frontier = np.array([index])
+        while len(frontier):
+            touching = ((low[:, None] < high[frontier]) & (high[:, None] > low[frontier])).all(axis=2)
+            above = middle[:, None] < middle[frontier]
+            new = (touching & above).any(axis=1) & ~stacked
+            stacked |= new
+            frontier = np.flatnonzero(new)
+        stacked[index] = False
+        self.asleep[stacked] = False
+        self.rest_ticks[stacked] = 0
+
+    def all_asleep(self):
+        """True when no body needs simulating (dragged bodies count as awake)"""
+        return bool((self.asleep & ~self.dragging).all())
+
+    def move_body(self, index, x, y):
+        """Place a body directly (e.g. while dragged) without interpolating the jump"""
+        self._pos[index] = (x, y)
+        self._prev_pos[index] = (x, y)
+
+    def interpolate(self, alpha):
+        """Positions blended between the last two steps (alpha 0 = previous, 1 = current)"""
+        return self.prev_pos + (self.pos - self.prev_pos) * alpha
+
+    def hit_test(self, x, y, margin=0):
+        """Return the id of the topmost body containing (x, y), or None.
+
+        `margin` shrinks each body's box on every side, e.g. to ignore the
+        transparent border around a sprite. Newer pets are drawn on top.
+        """
+        point = np.array([x, y])
+        inside = ((self.pos + margin <= point) & (point < self.pos + self.size - margin)).all(axis=1)
+        if not inside.any():
+            return None
+        return int(self.ids[inside].max())
+
+    def step(self, settings):
+        """Advance the simulation by one tick and return the impacts"""
+        if self.count == 0:
+            return []
+
+        self.prev_pos[:] = self.pos
+
+        # Bodies still being pushed out of an overlap this tick can't fall asleep
+        self.pushed = np.zeros(self.count, dtype=bool)
+        impacts = self._integrate(settings)
+        if len(self.obstacles):
+            impacts.extend(self._hit_obstacles(settings))
+        if settings.collision_enabled:
+            self._sweep()
+            impacts.extend(self._collide(settings))
+        self._update_sleep()
+        return impacts
+
+    def _update_sleep(self):
+        """Put bodies that have stayed slow for SLEEP_TICKS ticks to sleep"""
+        awake = ~(self.asleep | self.dragging)
+        slow = ((self.vel ** 2).sum(axis=1) < SLEEP_SPEED ** 2) & ~self.pushed
+
+        rest_ticks = self.rest_ticks
+        rest_ticks[awake & slow] += 1
+        rest_ticks[awake & ~slow] = 0
+
+        settled = awake & (rest_ticks >= SLEEP_TICKS)
+        if settled.any():
+            self.asleep[settled] = True
+            self.vel[settled] = 0
+            # Nothing left to interpolate towards
+            self.prev_pos[settled] = self.pos[settled]
+
+    def _integrate(self, settings):
+        """Apply gravity, friction and the screen edges to every free body"""
+        pos, vel, size = self.pos, self.vel, self.size
+        free = ~(self.dragging | self.asleep)
+
+        if settings.gravity_enabled:
+            vel[free, 1] += settings.gravity_strength
+
+        if settings.friction_enabled:
+            vel[free] *= settings.friction_strength
+
+        # Velocity before bounce decides whether the hit is audible
+        before = vel.copy()
+
+        new_pos = pos + vel
+        bounds = self.bounds(settings)
+        width, height = size[:, 0], size[:, 1]
+
+        # The part of a move past an edge comes back off it, scaled like
+        # the velocity, instead of being lost to the clamp
+        bounce = settings.bounce_strength
+
+        # Floor and ceiling of the column under the pet's center
+        column = bounds.column(pos[:, 0] + width / 2)
+        top = bounds.land_ceiling[column]
+        bottom = bounds.land_floor[column] - height
+        y = new_pos[:, 1]
+        low_y = y < top
+        high_y = (y > bottom) & ~low_y
+        y = np.where(low_y, top + (top - y) * bounce, np.where(high_y, bottom - (y - bottom) * bounce, y))
+        y = np.minimum(np.maximum(y, top), np.where(high_y, bottom, np.inf))
+
+        # Walls: the column the leading edge moves into must fit the whole pet;
+        # if it doesn't, the wall is where that stretch of columns begins
+        x = new_pos[:, 0]
+        moving_right = vel[:, 0] > 0
+        lead = bounds.column(np.where(moving_right, x + width - 1, x))
+        fits = bounds.covered[lead] & (y >= bounds.ceiling[lead]) & (y + height <= bounds.floor[lead])
+        high_x = ~fits & moving_right
+        low_x = ~fits & ~moving_right
+        right_wall = bounds.run_start[lead] - width
+        left_wall = bounds.run_end[lead]
+        x = np.where(low_x, left_wall + (left_wall - x) * bounce,
+                     np.where(high_x, right_wall - (x - right_wall) * bounce, x))
+        x = np.minimum(np.maximum(x, np.where(low_x, left_wall, -np.inf)), np.where(high_x, right_wall, np.inf))
+
+        new_pos = np.stack([x, y], axis=1)
+        hit = np.stack([low_x | high_x, low_y | high_y], axis=1) & free[:, None]
+        vel[hit] *= -settings.bounce_strength
+
+        pos[free] = new_pos[free]
+
+        if not settings.bounce_enabled:
+            return []
+
+        significant = (hit & (np.abs(before) > BOUNCE_SOUND_THRESHOLD)).any(axis=1)
+        speeds = np.hypot(before[:, 0], before[:, 1])
+        return [Impact(int(i), None, float(speeds[i])) for i in np.flatnonzero(significant)]
+
+    def _hit_obstacles(self, settings):
+        """Land free bodies on the obstacle rectangles and bounce them off the sides.
+
+        A body only collides with a rectangle it was clear of last tick, on
+        the side it came from, so a window opened on top of a pet doesn't
+        fling it anywhere; it falls out of the window instead.
+        """
+        size = self.size
+        margin = self._obstacle_margin()
+        if margin > self.obstacles.margin:
+            # A bigger pet than the grid was built for
+            self.obstacles = RectIndex(self.obstacles.rects, margin=margin)
+        obstacles = self.obstacles
+
+        rows = np.flatnonzero(~(self.dragging | self.asleep))
+        near = obstacles.query(self.pos[rows] + size[rows] / 2)
+        found, column = np.nonzero(near >= 0)
+        if len(found) == 0:
+            return []
+        body = rows[found]
+        rect = obstacles.rects[near[found, column]]
+
+        pos, prev_pos, vel = self.pos, self.prev_pos, self.vel
+        touching = (pos[body] < rect[:, 2:]).all(axis=1) & (pos[body] + size[body] > rect[:, :2]).all(axis=1)
+        was_above = prev_pos[body, 1] + size[body, 1] <= rect[:, 1]
+        was_below = prev_pos[body, 1] >= rect[:, 3]
+        was_left = prev_pos[body, 0] + size[body, 0] <= rect[:, 0]
+        was_right = prev_pos[body, 0] >= rect[:, 2]
+        hits = np.flatnonzero(touching & (was_above | was_below | was_left | was_right))
+
+        impacts = []
+        bounce = settings.bounce_strength
+        for n in hits.tolist():
+            i = int(body[n])
+            left, top, right, bottom = rect[n].tolist()
+            width, height = size[i].tolist()
+
+            # Coming from above or below wins at corners, so pets land on title bars
+            if was_above[n] or was_below[n]:
+                axis = 1
+                pos[i, 1] = top - height if was_above[n] else bottom
+                away = -1.0 if was_above[n] else 1.0
+            else:
+                axis = 0
+                pos[i, 0] = left - width if was_left[n] else right
+                away = -1.0 if was_left[n] else 1.0
+
+            into = abs(vel[i, axis])
+            if settings.bounce_enabled and into > BOUNCE_SOUND_THRESHOLD:
+                impacts.append(Impact(i, None, float(np.hypot(vel[i, 0], vel[i, 1]))))
+            if vel[i, axis] * away < 0:
+                vel[i, axis] = away * into * bounce
+        return impacts
+
+    def _masks_overlap(self, first, second):
+        """Pixel test for pairs of masked bodies; returns a bool per pair"""
+        # Whole pixels, as drawn
+        origin = self.pos.astype(int)
+        box = np.tile(origin, (1, 2)) + self.shape_box
+        a, b = box[first], box[second]
+        overlap = ((a[:, 0] < b[:, 2]) & (b[:, 0] < a[:, 2]) &
+                   (a[:, 1] < b[:, 3]) & (b[:, 1] < a[:, 3]))
+
+        corner = origin + self.shape_offset
+        shapes = self.shapes
+        shape = self.shape
+        for k in np.flatnonzero(overlap).tolist():
+            i, j = first[k], second[k]
+            dx, dy = (corner[j] - corner[i]).tolist()
+            overlap[k] = shapes[shape[i]].overlaps(shapes[shape[j]], dx, dy)
+        return overlap
+
+    def _centers(self):
+        """Collision centers: whole-pixel half sizes, matching the window layout;
+        masked bodies use the middle of their opaque box"""
+        box = self.shape_box
+        return np.where((self.shape > 0)[:, None], self.pos + (box[:, :2] + box[:, 2:]) / 2,
+                        self.pos + self.size // 2)
+
+    def _sweep(self):
+        """Continuous collision for fast bodies.
+
+        A body moving further in one tick than its own radius could pass
+        straight through another pet between two ticks. Each such body is
+        swept as a circle from where it started the tick to where it ended,
+        against every other body moving the way it did this tick, and both
+        are put back where the first such pair meets, just inside each
+        other; the contact solver then sees the overlap. Slow bodies, nearly
+        all of them, are left to the discrete test.
+        """
+        n = self.count
+        if n < 2:
+            return
+
+        # Inscribed circle: width / 4 as in the circle test, or half the
+        # shorter side of the opaque box
+        half = (self.shape_box[:, 2:] - self.shape_box[:, :2]) / 2
+        radius = np.where(self.shape > 0, half.min(axis=1), self.size[:, 0] / 4)
+
+        travel = self.pos - self.prev_pos
+        speed = np.hypot(travel[:, 0], travel[:, 1])
+        free = ~(self.dragging | self.asleep)
+        fast = np.flatnonzero(free & (speed > np.maximum(radius, 1)))
+        if len(fast) == 0:
+            return
+
+        centers = self._centers()
+        for i in fast.tolist():
+            # Solve |offset + t * move| = reach for the first t in [0, 1), relative
+            # to each other body, so two pets flying at each other are caught too
+            move = travel[i] - travel
+            offset = centers[i] - travel[i] - (centers - travel)
+            reach = radius + radius[i]
+            a = (move ** 2).sum(axis=1)
+            b = 2 * (offset * move).sum(axis=1)
+            c = (offset ** 2).sum(axis=1) - reach ** 2
+            disc = b * b - 4 * a * c
+            moving = a > 0
+            t = np.full(n, np.inf)
+            t[moving] = (-b[moving] - np.sqrt(np.maximum(disc[moving], 0))) / (2 * a[moving])
+
+            # Bodies already overlapping at the start are the discrete test's job
+            hit = moving & (c > 0) & (disc >= 0) & (t >= 0) & (t < 1)
+            hit[i] = False
+            if not hit.any():
+                continue
+            j = np.flatnonzero(hit)[t[hit].argmin()]
+            t = min(t[j] + SWEEP_OVERLAP / np.sqrt(a[j]), 1.0)
+            for k in ((i, j) if free[j] else (i,)):
+                self.pos[k] = self.prev_pos[k] + travel[k] * t
+                centers[k] = centers[k] - travel[k] * (1 - t)
+                travel[k] = travel[k] * t
+
+    def _collide(self, settings):
+        """Find overlapping pairs and resolve them with impulses"""
+        n = self.count
+        if n < 2:
+            return []
+
+        size = self.size
+        widths = size[:, 0]
+        masked = self.shape > 0
+        centers = self._centers()
+
+        # Broad phase: only pets in the same or adjacent grid cells are tested.
+        # Circle collision distance is (w1 + w2) // 4, never more than the widest pet / 2;
+        # masks can touch anywhere inside the two bodies, up to the largest body size apart.
+        if masked.any():
+            self.broad_phase.cell_size = max(1, int(size.max()))
+        else:
+            self.broad_phase.cell_size = max(1, int(widths.max()) // 2)
+        self.broad_phase.build(centers)
+        first, second = self.broad_phase.candidate_pairs()
+        if len(first) == 0:
+            return []
+
+        # Skip pairs the user is holding together and pairs that are both asleep
+        dragging = self.dragging
+        asleep = self.asleep
+        keep = ~(dragging[first] & dragging[second]) & ~(asleep[first] & asleep[second])
+
+        # Narrow phase: squared-distance rejection, no square roots yet
+        delta = centers[second] - centers[first]
+        dist_sq = (delta ** 2).sum(axis=1)
+        min_dist = (widths[first] + widths[second]) // 4
+        both_masked = masked[first] & masked[second]
+        hit = keep & ~both_masked & (dist_sq < min_dist ** 2)
+
+        # Masked pairs: opaque boxes must overlap before any pixels are compared
+        pair_masked = np.flatnonzero(keep & both_masked)
+        if len(pair_masked):
+            hit[pair_masked] = self._masks_overlap(first[pair_masked], second[pair_masked])
+
+        hits = np.flatnonzero(hit)
+        if len(hits) == 0:
+            return []
+
+        # Report impacts in a stable order so the result doesn't depend on the grid
+        hits = hits[np.lexsort((second[hits], first[hits]))]
+        return self._solve(settings, first[hits], second[hits], delta[hits], dist_sq[hits])
+
+    def _solve(self, settings, i, j, delta, dist_sq):
+        """Resolve contacts between rows i and j (delta = center j - center i)"""
+        vel = self.vel
+        dist = np.sqrt(dist_sq)
+        apart = dist > 0
+        normal = np.zeros_like(delta)
+        normal[:, 1] = 1.0
+        normal[apart] = delta[apart] / dist[apart, None]
+
+        # Depth along the normal, from how far each body reaches towards the other
+        depth = np.maximum(self._reach(i, normal) + self._reach(j, -normal) - dist, 0)
+
+        # Flat-sided shapes overlap least across a side, not along the line
+        # between their centers (a box resting on another's corner): masked
+        # pairs take the sampled direction they overlap least in when that
+        # is clearly shallower, the way a separating-axis test would
+        shape = self.shape
+        both = np.flatnonzero((shape[i] > 0) & (shape[j] > 0))
+        if len(both):
+            reach_i = self.shape_support[shape[i[both]]]
+            reach_j = np.roll(self.shape_support[shape[j[both]]], -(SUPPORT_DIRECTIONS // 2), axis=1)
+            overlap = reach_i + reach_j - delta[both] @ SUPPORT_AXES.T
+            least = overlap.argmin(axis=1)
+            least_depth = overlap[np.arange(len(both)), least]
+            shallower = least_depth < depth[both] - PENETRATION_SLOP
+            rows = both[shallower]
+            normal[rows] = SUPPORT_AXES[least[shallower]]
+            depth[rows] = np.maximum(least_depth[shallower], 0)
+        tangent = np.stack([-normal[:, 1], normal[:, 0]], axis=1)
+
+        # Closing speed before solving (negative = approaching)
+        approach = ((vel[j] - vel[i]) * normal).sum(axis=1)
+
+        # Resting pets wake for hard hits and anything the user drags into them;
+        # otherwise they hold still like the floor
+        dragging = self.dragging
+        asleep = self.asleep
+        wake = (asleep[i] & ((-approach > WAKE_SPEED) | dragging[j]),
+                asleep[j] & ((-approach > WAKE_SPEED) | dragging[i]))
+        for side, rows in zip(wake, (i, j)):
+            if side.any():
+                woken = rows[side]
+                asleep[woken] = False
+                self.rest_ticks[woken] = 0
+
+        # Held and resting bodies don't move (infinite mass)
+        inv_mass = np.where(dragging | asleep, 0.0, self.inv_mass)
+        inv_i = inv_mass[i]
+        inv_j = inv_mass[j]
+        live = (inv_i + inv_j) > 0
+
+        # Only real hits are reported, not pets resting on each other
+        loud = approach < -BOUNCE_SOUND_THRESHOLD
+        impacts = [Impact(a, b, -speed)
+                   for a, b, speed in zip(i[loud].tolist(), j[loud].tolist(), approach[loud].tolist())]
+        if not live.any():
+            return impacts
+        i, j, inv_i, inv_j = i[live], j[live], inv_i[live], inv_j[live]
+        normal, tangent, depth, approach = normal[live], tangent[live], depth[live], approach[live]
+
+        # Every contact is solved against the same velocities and the results
+        # summed (Jacobi). Splitting each body's mass between its contacts
+        # keeps the sum from overshooting in piles.
+        contacts = np.bincount(np.concatenate([i, j]), minlength=self.count)
+        effective = inv_i * contacts[i] + inv_j * contacts[j]
+
+        # Bounce only off real impacts; slow contacts come to rest
+        restitution = settings.bounce_strength if settings.bounce_enabled else 0.0
+        target = np.where(approach < -RESTING_SPEED, -restitution * approach, 0.0)
+        friction = CONTACT_FRICTION if settings.friction_enabled else 0.0
+
+        normal_impulse = np.zeros(len(i))
+        tangent_impulse = np.zeros(len(i))
+        for _ in range(SOLVER_ITERATIONS):
+            relative = vel[j] - vel[i]
+
+            # Accumulated normal impulse may only push, never pull
+            total = np.maximum(normal_impulse + (target - (relative * normal).sum(axis=1)) / effective, 0)
+            d_normal = total - normal_impulse
+            normal_impulse = total
+
+            # Friction is capped by the normal impulse (Coulomb)
+            limit = friction * normal_impulse
+            total = np.clip(tangent_impulse - (relative * tangent).sum(axis=1) / effective, -limit, limit)
+            d_tangent = total - tangent_impulse
+            tangent_impulse = total
+
+            impulse = d_normal[:, None] * normal + d_tangent[:, None] * tangent
+            np.add.at(vel, i, -impulse * inv_i[:, None])
+            np.add.at(vel, j, impulse * inv_j[:, None])
+
+        # Push overlapping pets apart over a few passes, re-measuring the depth
+        # along each contact normal after every pass. A pet's moves from its
+        # contacts are averaged rather than summed so piles don't overshoot,
+        # and the lower pet of a stacked pair holds still, so a pile is pushed
+        # up off its base rather than down into it.
+        pos = self.pos
+        lift_i = np.where((normal[:, 1] < -STACKED) & (inv_j > 0), 0.0, inv_i)
+        lift_j = np.where((normal[:, 1] > STACKED) & (inv_i > 0), 0.0, inv_j)
+        share = lift_i + lift_j
+        share[share == 0] = np.inf
+        moved = np.unique(np.concatenate([i[lift_i > 0], j[lift_j > 0]]))
+        start = pos.copy()
+        for _ in range(POSITION_ITERATIONS):
+            moved_by = pos - start
+            now = depth - ((moved_by[j] - moved_by[i]) * normal).sum(axis=1)
+            correction = np.minimum(np.maximum(now - PENETRATION_SLOP, 0), MAX_CORRECTION) * CORRECTION_PERCENT
+            if not correction.any():
+                break
+            push = (correction / share)[:, None] * normal
+            shift = np.zeros_like(pos)
+            np.add.at(shift, i, -push * lift_i[:, None])
+            np.add.at(shift, j, push * lift_j[:, None])
+            pos += shift / np.maximum(contacts, 1)[:, None]
+            self._clamp_to_screen(moved, settings)
+
+        # A pet held up by a correction stops falling, or a whole resting
+        # column would keep a falling speed it never uses
+        lifted = moved[pos[moved, 1] < start[moved, 1]]
+        vel[lifted, 1] = np.minimum(vel[lifted, 1], 0)
+
+        # Pets still visibly overlapping are not at rest yet, and a sleeping
+        # pet wedged into one wakes so the two can work themselves apart
+        moved_by = pos - start
+        deep = depth - ((moved_by[j] - moved_by[i]) * normal).sum(axis=1) > VISIBLE_OVERLAP
+        self.pushed[i[deep & (inv_i > 0)]] = True
+        self.pushed[j[deep & (inv_j > 0)]] = True
+        wedged = np.concatenate([i[deep & asleep[i]], j[deep & asleep[j]]])
+        asleep[wedged] = False
+        self.rest_ticks[wedged] = 0
+        return impacts
+
+    def _reach(self, rows, direction):
+        """How far bodies reach from their centers along unit `direction`s:
+        masked bodies to their farthest opaque pixel, others as circles of
+        radius width / 4"""
+        # Interpolated between the two nearest sampled directions
+        position = np.arctan2(direction[:, 1], direction[:, 0]) * (SUPPORT_DIRECTIONS / (2 * np.pi))
+        below = np.floor(position)
+        fraction = position - below
+        below = below.astype(int) % SUPPORT_DIRECTIONS
+        above = (below + 1) % SUPPORT_DIRECTIONS
+
+        shape = self.shape[rows]
+        support = self.shape_support[shape]
+        pairs = np.arange(len(rows))
+        reach = support[pairs, below] * (1 - fraction) + support[pairs, above] * fraction
+        return np.where(shape > 0, reach, self.size[rows, 0] / 4)
+
+    def _clamp_to_screen(self, rows, settings):
+        """Keep bodies moved by a correction inside the screen (or monitors)"""
+        bounds = self.bounds(settings)
+        pos = self.pos
+        size = self.size[rows]
+        x, y = pos[rows, 0], pos[rows, 1]
+        column = bounds.column(x + size[:, 0] / 2)
+        pos[rows, 0] = np.minimum(np.maximum(x, bounds.left), bounds.right - size[:, 0])
+        pos[rows, 1] = np.minimum(np.maximum(y, bounds.land_ceiling[column]), bounds.land_floor[column] - size[:, 1])
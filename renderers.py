@@ -0,0 +1,273 @@
+"""Ways of putting pets on the desktop.
+
+Both renderers share the same small interface used by EnhancedPet, keyed
+by the pet ids handed out by the physics world:
+    add(pet_id, tk_image, x, y, width, height)  show a new pet
+    move(pet_id, x, y)                           move one pet immediately (dragging)
+    set_image(pet_id, tk_image)                  swap the picture shown for a pet (impact frames)
+    render(pet_ids, positions)                   push a frame for the listed pets; returns ids
+                                                 of pets whose window was destroyed (already forgotten)
+    set_area(left, top, right, bottom)           the screen area pets can be in changed
+    remove(pet_id) / clear() / destroy()
+
+Mouse events are forwarded to the handler object's on_click, on_drag,
+on_release, on_double_click and on_right_click methods as (event, pet_id),
+with event.x / event.y relative to the pet's top-left corner.
+"""
+import tkinter as tk
+
+# Transparent border around each sprite (half on each side)
+WINDOW_PADDING = 20
+
+
+def set_transparent_color(window, color):
+    """Make `color` see-through and return True; only Windows supports this,
+    elsewhere it stays opaque and this returns False"""
+    try:
+        window.attributes('-transparentcolor', color)
+    except tk.TclError:
+        return False
+    return True
+
+
+class WindowRenderer:
+    """One borderless Toplevel per pet, moved with geometry()"""
+
+    def __init__(self, root, handler):
+        self.root = root
+        self.handler = handler
+        self.views = {}
+
+    def add(self, pet_id, tk_image, x, y, width, height):
+        # Create pet window
+        pet_window = tk.Toplevel(self.root)
+        pet_window.overrideredirect(True)  # No window decorations
+        pet_window.attributes('-topmost', True)  # Stay on top
+
+        # Configure transparency
+        pet_window.configure(bg='black')
+        set_transparent_color(pet_window, 'black')
+        pet_window.geometry(f"{width}x{height}+{x}+{y}")
+
+        # Create canvas
+        canvas = tk.Canvas(
+            pet_window,
+            width=width,
+            height=height,
+            bg='black',
+            highlightthickness=0
+        )
+        canvas.pack()
+
+        # Create image on canvas and keep a reference on the window as well
+        sprite = canvas.create_image(width // 2, height // 2, image=tk_image)
+        pet_window.pet_tk_image = tk_image
+
+        # Bind events (with the pet's stable id)
+        handler = self.handler
+        canvas.bind("<Button-1>", lambda e: handler.on_click(e, pet_id))
+        canvas.bind("<B1-Motion>", lambda e: handler.on_drag(e, pet_id))
+        canvas.bind("<ButtonRelease-1>", lambda e: handler.on_release(e, pet_id))
+        canvas.bind("<Double-Button-1>", lambda e: handler.on_double_click(e, pet_id))
+        canvas.bind("<Button-3>", lambda e: handler.on_right_click(e, pet_id))
+
+        self.views[pet_id] = {'window': pet_window, 'canvas': canvas, 'sprite': sprite}
+
+    def move(self, pet_id, x, y):
+        self.views[pet_id]['window'].geometry(f"+{x}+{y}")
+
+    def set_image(self, pet_id, tk_image):
+        view = self.views[pet_id]
+        try:
+            view['canvas'].itemconfig(view['sprite'], image=tk_image)
+            view['window'].pet_tk_image = tk_image
+        except tk.TclError:
+            # Window already gone; the next render() reports it
+            pass
+
+    def render(self, pet_ids, positions):
+        """Move the given pet windows"""
+        destroyed = []
+        views = self.views
+        for pet_id, (x, y) in zip(pet_ids, positions):
+            try:
+                views[pet_id]['window'].geometry(f"+{x}+{y}")
+            except tk.TclError:
+                # Window was destroyed behind our back
+                destroyed.append(pet_id)
+
+        for pet_id in destroyed:
+            del views[pet_id]
+        return destroyed
+
+    def set_area(self, left, top, right, bottom):
+        pass
+
+    def remove(self, pet_id):
+        window = self.views.pop(pet_id)['window']
+        if window.winfo_exists():
+            window.destroy()
+
+    def clear(self):
+        for view in self.views.values():
+            if view['window'].winfo_exists():
+                view['window'].destroy()
+        self.views = {}
+
+    def destroy(self):
+        self.clear()
+
+
+class OverlayRenderer:
+    """A single transparent canvas over the whole area pets can be in, with
+    one image item per pet.
+
+    Moving a pet is a canvas.coords() call instead of a window-manager move.
+    The canvas receives every click, so hit-testing against the physics world
+    happens here and events are re-targeted to the pet under the pointer.
+    Transparent pixels are click-through where '-transparentcolor' is
+    supported (Windows).
+
+    The canvas covers `area` (left, top, right, bottom): the primary screen,
+    or every monitor in multi-monitor mode, which may start left of or above
+    the primary one. Canvas coordinates are screen coordinates minus
+    (left, top).
+    """
+
+    def __init__(self, root, handler, world, area):
+        self.root = root
+        self.handler = handler
+        self.world = world
+        self.items = {}
+        self.half_sizes = {}
+        self.images = {}
+
+        # Pet currently held by the left button, so drags stay on it
+        self.grabbed = None
+
+        self.window = tk.Toplevel(root)
+        self.window.overrideredirect(True)
+        self.window.attributes('-topmost', True)
+        self.window.configure(bg='black')
+        # Without it the overlay is an opaque window over the whole screen;
+        # the caller checks this and falls back to WindowRenderer
+        self.transparent = set_transparent_color(self.window, 'black')
+
+        self.canvas = tk.Canvas(self.window, bg='black', highlightthickness=0)
+        self.canvas.pack()
+        self.set_area(*area)
+
+        self.canvas.bind("<Button-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_motion)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<Button-3>", self._on_right_click)
+
+        # Nothing to show yet
+        self.window.withdraw()
+
+    def add(self, pet_id, tk_image, x, y, width, height):
+        left, top = self.origin
+        half = (width // 2 - left, height // 2 - top)
+        self.items[pet_id] = self.canvas.create_image(x + half[0], y + half[1], image=tk_image)
+        # Offset from a pet's screen position to its canvas center
+        self.half_sizes[pet_id] = half
+        self.images[pet_id] = tk_image
+        if len(self.items) == 1:
+            self.window.deiconify()
+
+    def move(self, pet_id, x, y):
+        half_w, half_h = self.half_sizes[pet_id]
+        self.canvas.coords(self.items[pet_id], x + half_w, y + half_h)
+
+    def set_image(self, pet_id, tk_image):
+        self.canvas.itemconfig(self.items[pet_id], image=tk_image)
+        self.images[pet_id] = tk_image
+
+    def render(self, pet_ids, positions):
+        """Move the given canvas items"""
+        coords = self.canvas.coords
+        items = self.items
+        half_sizes = self.half_sizes
+        for pet_id, (x, y) in zip(pet_ids, positions):
+            half_w, half_h = half_sizes[pet_id]
+            coords(items[pet_id], x + half_w, y + half_h)
+        return []
+
+    def set_area(self, left, top, right, bottom):
+        old_left, old_top = getattr(self, 'origin', (left, top))
+        self.origin = (left, top)
+        width, height = right - left, bottom - top
+        self.window.geometry(f"{width}x{height}+{left}+{top}")
+        self.canvas.config(width=width, height=height)
+
+        # Items are placed relative to the origin
+        dx, dy = old_left - left, old_top - top
+        if dx or dy:
+            self.canvas.move(tk.ALL, dx, dy)
+            self.half_sizes = {pet_id: (half_w + dx, half_h + dy)
+                               for pet_id, (half_w, half_h) in self.half_sizes.items()}
+
+    def remove(self, pet_id):
+        self.canvas.delete(self.items.pop(pet_id))
+        del self.half_sizes[pet_id]
+        del self.images[pet_id]
+        if self.grabbed == pet_id:
+            self.grabbed = None
+        if not self.items:
+            self.window.withdraw()
+
+    def clear(self):
+        self.canvas.delete(tk.ALL)
+        self.items = {}
+        self.half_sizes = {}
+        self.images = {}
+        self.grabbed = None
+        self.window.withdraw()
+
+    def destroy(self):
+        self.clear()
+        self.window.destroy()
+
+    def _hit(self, event):
+        """Find the pet under the pointer and make the event pet-relative"""
+        margin = WINDOW_PADDING // 2
+        left, top = self.origin
+        pet_id = self.world.hit_test(event.x + left, event.y + top, margin)
+        if pet_id is not None:
+            self._localize(event, pet_id)
+        return pet_id
+
+    def _localize(self, event, pet_id):
+        row = self.world.index_of(pet_id)
+        if row is not None:
+            x, y = self.world.pos[row]
+            left, top = self.origin
+            event.x -= int(x) - left
+            event.y -= int(y) - top
+
+    def _on_press(self, event):
+        self.grabbed = self._hit(event)
+        if self.grabbed is not None:
+            self.handler.on_click(event, self.grabbed)
+
+    def _on_motion(self, event):
+        if self.grabbed is not None:
+            self._localize(event, self.grabbed)
+            self.handler.on_drag(event, self.grabbed)
+
+    def _on_release(self, event):
+        if self.grabbed is not None:
+            pet_id, self.grabbed = self.grabbed, None
+            self._localize(event, pet_id)
+            self.handler.on_release(event, pet_id)
+
+    def _on_double_click(self, event):
+        pet_id = self._hit(event)
+        if pet_id is not None:
+            self.handler.on_double_click(event, pet_id)
+
+    def _on_right_click(self, event):
+        pet_id = self._hit(event)
+        if pet_id is not None:
+            self.handler.on_right_click(event, pet_id)
@@ -0,0 +1,41 @@
+"""Saving the desktop between runs.
+
+A session is one small JSON file: the settings, which images were in use
+and every pet as a flat row. The images themselves are not in it; they are
+mapped back in from the disk cache (see storage.py) by content hash, or
+decoded again from their original file if the cache lost them.
+"""
+import json
+import os
+
+SESSION_NAME = "session.json"
+SESSION_VERSION = 1
+
+# Column order of a saved pet row
+PET_COLUMNS = ("asset", "scale", "x", "y", "vx", "vy", "asleep")
+
+
+def save_session(path, session):
+    """Write the session dict atomically, so a crash never leaves half a file"""
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w") as f:
+            json.dump(dict(session, version=SESSION_VERSION), f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Error saving session: {e}")
+
+
+def load_session(path):
+    """The saved session dict, or None if there is none (or it can't be read)"""
+    try:
+        with open(path) as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error loading session: {e}")
+        return None
+    if not isinstance(session, dict) or session.get("version") != SESSION_VERSION:
+        return None
+    return session
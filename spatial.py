@@ -0,0 +1,120 @@
+"""Uniform-grid broad phase for pet-pet collisions.
+
+Pets are bucketed by the grid cell that holds their center. With the cell
+size at least the largest collision distance, two pets can only touch if
+their cells are equal or adjacent, so each cell is compared with itself and
+four of its eight neighbours ("half neighbourhood"), which yields every
+unordered pair exactly once.
+
+RectIndex is the static counterpart for a fixed set of rectangles (other
+applications' windows): built once per rectangle list, then looked up for
+every pet at once.
+"""
+import numpy as np
+
+# Cell size (pixels) of the static rectangle grid
+RECT_CELL_SIZE = 128
+
+# Forward half of the 8-neighbourhood; the other half is covered when the
+# neighbouring cell runs its own scan
+NEIGHBOUR_OFFSETS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class SpatialHash:
+    """Buckets points into square cells and lists nearby pairs"""
+
+    def __init__(self, cell_size):
+        self.cell_size = max(1, cell_size)
+        self.cells = {}
+
+    def build(self, points):
+        """Rebuild the grid from an (n, 2) array of points"""
+        cells = {}
+        coords = np.floor_divide(points, self.cell_size).astype(int).tolist()
+        for index, (cx, cy) in enumerate(coords):
+            key = (cx, cy)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+        self.cells = cells
+
+    def candidate_pairs(self):
+        """Return (first, second) index arrays of pets in the same or adjacent cells"""
+        first = []
+        second = []
+        cells = self.cells
+
+        for (cx, cy), bucket in cells.items():
+            # Pairs inside the cell
+            for a in range(len(bucket)):
+                i = bucket[a]
+                for b in range(a + 1, len(bucket)):
+                    first.append(i)
+                    second.append(bucket[b])
+
+            # Pairs with forward neighbours
+            for dx, dy in NEIGHBOUR_OFFSETS:
+                other = cells.get((cx + dx, cy + dy))
+                if other is None:
+                    continue
+                for i in bucket:
+                    for j in other:
+                        first.append(i)
+                        second.append(j)
+
+        return np.array(first, dtype=int), np.array(second, dtype=int)
+
+
+class RectIndex:
+    """Grid over fixed rectangles (left, top, right, bottom).
+
+    Every cell lists the rectangles that come within `margin` of it, in a
+    table padded with -1, so query() finds the rectangles near any number
+    of points with a single lookup per point.
+    """
+
+    def __init__(self, rects, margin=0, cell_size=RECT_CELL_SIZE):
+        self.rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        self.margin = margin
+        self.cell_size = cell_size
+
+        if len(self.rects) == 0:
+            self.origin = np.zeros(2, dtype=int)
+            self.shape = (0, 0)
+            self.table = np.full((0, 1), -1, dtype=int)
+            return
+
+        grown = self.rects + np.array([-margin, -margin, margin, margin])
+        first = np.floor_divide(grown[:, :2], cell_size).astype(int)
+        last = np.floor_divide(grown[:, 2:], cell_size).astype(int)
+        self.origin = first.min(axis=0)
+        columns, rows = last.max(axis=0) - self.origin + 1
+        self.shape = (int(columns), int(rows))
+
+        buckets = {}
+        for index, ((x0, y0), (x1, y1)) in enumerate(zip((first - self.origin).tolist(),
+                                                         (last - self.origin).tolist())):
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    buckets.setdefault(cy * columns + cx, []).append(index)
+
+        depth = max(len(bucket) for bucket in buckets.values())
+        self.table = np.full((columns * rows, depth), -1, dtype=int)
+        for cell, bucket in buckets.items():
+            self.table[cell, :len(bucket)] = bucket
+
+    def __len__(self):
+        return len(self.rects)
+
+    def query(self, points):
+        """(n, depth) indices of the rectangles near each point, -1 padded"""
+        found = np.full((len(points), self.table.shape[1]), -1, dtype=int)
+        if len(self.rects) == 0:
+            return found
+        cells = np.floor_divide(points, self.cell_size).astype(int) - self.origin
+        columns, rows = self.shape
+        inside = (cells >= 0).all(axis=1) & (cells[:, 0] < columns) & (cells[:, 1] < rows)
+        found[inside] = self.table[cells[inside, 1] * columns + cells[inside, 0]]
+        return found
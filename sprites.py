@@ -0,0 +1,239 @@
+"""Shared, reference-counted pet sprites.
+
+Ten pets launched from the same image at the same size all use one scaled
+PIL image and one Tk PhotoImage. Sprites are keyed by
+(source image hash, size scale, effect); unused ones are kept in LRU order
+so relaunching is instant, and only sprites no pet holds can be evicted.
+
+With a storage.BlobCache, scaled frames are also written to disk and
+mapped back in on later runs instead of being resampled.
+
+Each sprite can also carry a small atlas of impact frames (see effects.py).
+The PIL work runs on a background thread; the Tk photos are made from the
+results on the Tk thread by load_ready_frames(), outside the frame loop.
+"""
+import bisect
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageTk
+
+from effects import EFFECTS, IMPACT_SEQUENCE, render_impact_frames
+from masks import AlphaMask
+
+# Unused sprites kept around for quick relaunch
+MAX_UNUSED_SPRITES = 32
+
+
+def image_key(image, *more, durations=()):
+    """Content hash identifying a source image (or every frame of an animation)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in (image,) + more:
+        digest.update(frame.tobytes())
+        digest.update(f"{frame.mode}{frame.size}".encode())
+    digest.update(repr(list(durations)).encode())
+    return digest.hexdigest()
+
+
+class Sprite:
+    """A scaled (and possibly filtered) pet image plus its Tk photo.
+
+    Animated sprites also carry every scaled frame; `image` is the first.
+    """
+
+    def __init__(self, key, image, frames=None, durations=None):
+        self.key = key
+        self.image = image
+        self._tk_image = None
+        self._mask = None
+        self.refs = 0
+
+        # Animation frames (PIL) and when each one ends, in ms from the start
+        self.frames = frames
+        self.frame_ends = None
+        self._frame_images = None
+        if frames:
+            self.frame_ends = []
+            total = 0
+            for duration in durations:
+                total += duration
+                self.frame_ends.append(total)
+
+        # Impact atlas: pending PIL frames, then one Tk photo per IMPACT_SEQUENCE step
+        self.frames_future = None
+        self.impact_frames = None
+
+    @property
+    def tk_image(self):
+        # Created on first use, on the Tk thread
+        if self._tk_image is None:
+            self._tk_image = ImageTk.PhotoImage(self.image)
+        return self._tk_image
+
+    @property
+    def size(self):
+        return self.image.size
+
+    @property
+    def mask(self):
+        """Collision mask of the (first) frame, built once on first use"""
+        if self._mask is None:
+            self._mask = AlphaMask.from_image(self.image)
+        return self._mask
+
+    @property
+    def nbytes(self):
+        """Rough memory use: RGBA PIL frames plus a Tk photo of each"""
+        frames = len(self.frames) if self.frames else 1
+        if self.impact_frames:
+            frames += len(set(IMPACT_SEQUENCE))
+        return 2 * 4 * self.image.width * self.image.height * frames
+
+    @property
+    def animated(self):
+        return self.frames is not None
+
+    @property
+    def frame_images(self):
+        """Tk photos of every animation frame, made once on first use"""
+        if self._frame_images is None:
+            self._frame_images = [self.tk_image] + [ImageTk.PhotoImage(frame) for frame in self.frames[1:]]
+        return self._frame_images
+
+    def frame_at(self, ms):
+        """Index of the animation frame showing `ms` into the (looping) animation"""
+        return bisect.bisect_right(self.frame_ends, ms % self.frame_ends[-1])
+
+
+class SpriteCache:
+    """LRU cache of sprites with reference counting"""
+
+    def __init__(self, max_unused=MAX_UNUSED_SPRITES, disk=None):
+        self.max_unused = max_unused
+        self.disk = disk
+        self.sprites = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sprite-frames")
+
+        # Sprites whose impact frames are still being rendered
+        self.pending_frames = []
+
+    def acquire(self, source_key, source, scale=1.0, effect=None, animation=None):
+        """Return the sprite for this source/scale/effect, creating it if needed.
+
+        `animation` is an images.Animation whose first frame is `source`;
+        its frames are scaled along with it. Every acquire() must be paired
+        with a release() once the pet is gone.
+        """
+        key = (source_key, round(scale, 3), effect)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._load(key) or self._create(key, source, scale, effect, animation)
+            self.sprites[key] = sprite
+        else:
+            self.sprites.move_to_end(key)
+        sprite.refs += 1
+        return sprite
+
+    def release(self, sprite):
+        """Drop one reference; unused sprites may then be evicted"""
+        sprite.refs -= 1
+        if sprite.refs <= 0:
+            sprite.refs = 0
+            self._evict()
+
+    @property
+    def nbytes(self):
+        return sum(sprite.nbytes for sprite in self.sprites.values())
+
+    def in_use(self, source_key):
+        """True if some pet holds a sprite made from this source"""
+        return any(sprite.refs for key, sprite in self.sprites.items() if key[0] == source_key)
+
+    def evict_unused(self, max_bytes, source_key=None):
+        """Forget unused sprites, least recently used first, until at most
+        `max_bytes` are cached (or, with `source_key`, all of that source's)"""
+        total = self.nbytes
+        for key, sprite in list(self.sprites.items()):
+            if source_key is None and total <= max_bytes:
+                break
+            if sprite.refs == 0 and (source_key is None or key[0] == source_key):
+                total -= sprite.nbytes
+                del self.sprites[key]
+
+    def prepare_frames(self, sprite):
+        """Start rendering the sprite's impact frames in the background"""
+        if sprite.frames_future is None:
+            sprite.frames_future = self.executor.submit(render_impact_frames, sprite.image)
+            self.pending_frames.append(sprite)
+
+    def load_ready_frames(self):
+        """Turn finished atlases into Tk photos; call from the Tk thread.
+
+        Returns True while some atlas is still being rendered.
+        """
+        still_pending = []
+        for sprite in self.pending_frames:
+            future = sprite.frames_future
+            if not future.done():
+                still_pending.append(sprite)
+                continue
+            try:
+                frames = future.result()
+            except Exception as e:
+                print(f"Error rendering impact frames: {e}")
+                continue
+            photos = {name: ImageTk.PhotoImage(image) for name, image in frames.items()}
+            sprite.impact_frames = [photos[name] for name in IMPACT_SEQUENCE]
+        self.pending_frames = still_pending
+        return bool(still_pending)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _create(self, key, source, scale, effect, animation):
+        image = self._render(source, scale, effect)
+        if animation is not None and len(animation.frames) > 1:
+            frames = [image] + [self._render(frame, scale, effect) for frame in animation.frames[1:]]
+            durations = list(animation.durations)
+            sprite = Sprite(key, image, frames, durations)
+        else:
+            frames, durations = [image], None
+            sprite = Sprite(key, image)
+
+        if self.disk is not None:
+            self.disk.put_later(("sprite",) + key, np.stack([np.asarray(frame) for frame in frames]),
+                                durations=durations)
+        return sprite
+
+    def _load(self, key):
+        """A sprite saved by an earlier run, or None"""
+        if self.disk is None:
+            return None
+        found = self.disk.get(("sprite",) + key)
+        if found is None:
+            return None
+
+        array, meta = found
+        frames = [Image.fromarray(frame, "RGBA") for frame in array]
+        if meta.get("durations"):
+            return Sprite(key, frames[0], frames, meta["durations"])
+        return Sprite(key, frames[0])
+
+    def _render(self, source, scale, effect):
+        # Always RGBA, so fresh and cached sprites look the same
+        image = source if source.mode == "RGBA" else source.convert("RGBA")
+        if scale != 1.0:
+            new_width = max(1, int(source.width * scale))
+            new_height = max(1, int(source.height * scale))
+            image = image.resize((new_width, new_height), Image.LANCZOS)
+        if effect is not None:
+            image = EFFECTS[effect](image)
+        return image
+
+    def _evict(self):
+        """Forget the least recently used sprites no pet is holding"""
+        unused = [key for key, sprite in self.sprites.items() if sprite.refs == 0]
+        for key in unused[:max(0, len(unused) - self.max_unused)]:
+            del self.sprites[key]
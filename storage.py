@@ -0,0 +1,142 @@
+"""Content-addressed cache of NumPy arrays on disk.
+
+Scaled sprites, decoded pet images and synthesized tones are saved as
+.npy files under cache/ (next to sounds/), named by a hash of their key,
+so a restart maps them back in with np.load(mmap_mode="r") instead of
+decoding and resampling again. manifest.json records what each file is and
+when it was last used; the least recently used files are deleted once the
+cache grows past its size limit.
+
+The cache is best effort: any I/O error just means a miss.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Largest total size of the cached files
+CACHE_MAX_MB = 256
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def key_digest(key):
+    """File name stem for a cache key (any tuple of plain values)"""
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+class BlobCache:
+    """Arrays stored by key, safe to use from several threads"""
+
+    def __init__(self, directory, max_mb=CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.dirty = False
+        os.makedirs(directory, exist_ok=True)
+
+        # Writes requested from the Tk thread happen here
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-writer")
+
+        # digest -> {"key", "bytes", "used", "meta"}
+        self.entries = self._read_manifest()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest + ".npy")
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+
+        # Files deleted by hand are simply forgotten
+        entries = manifest.get("entries", {})
+        return {digest: entry for digest, entry in entries.items() if os.path.exists(self._path(digest))}
+
+    def _write_manifest(self):
+        """Replace the manifest atomically; call with the lock held"""
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f)
+            os.replace(temp_path, path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error writing cache manifest: {e}")
+
+    def get(self, key):
+        """Return (read-only memory-mapped array, meta dict), or None on a miss"""
+        digest = key_digest(key)
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                return None
+            entry["used"] = time.time()
+            self.dirty = True
+
+        try:
+            array = np.load(self._path(digest), mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError):
+            with self.lock:
+                self.entries.pop(digest, None)
+                self.dirty = True
+            return None
+        return array, entry["meta"]
+
+    def put(self, key, array, **meta):
+        """Store an array (and JSON-able meta values) under `key`"""
+        digest = key_digest(key)
+        path = self._path(digest)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Error writing cache file: {e}")
+            return
+
+        with self.lock:
+            self.entries[digest] = {"key": repr(key), "bytes": size, "used": time.time(), "meta": meta}
+            self._prune()
+            self._write_manifest()
+
+    def put_later(self, key, array, **meta):
+        """put() on the writer thread; `array` must not be modified afterwards"""
+        self.writer.submit(self.put, key, array, **meta)
+
+    def _prune(self):
+        """Delete least recently used files beyond the size limit; call with the lock held"""
+        total = sum(entry["bytes"] for entry in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for digest in sorted(self.entries, key=lambda d: self.entries[d]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(digest)["bytes"]
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+    def flush(self):
+        """Save last-used times (e.g. on exit)"""
+        with self.lock:
+            if self.dirty:
+                self._write_manifest()
+
+    def close(self):
+        """Finish pending writes and save the manifest"""
+        self.writer.shutdown(wait=True)
+        self.flush()
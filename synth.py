@@ -0,0 +1,108 @@
+"""Procedural bounce sounds.
+
+Tones are generated with NumPy in one shot and handed straight to
+pygame.mixer.Sound(buffer=...), so nothing touches the disk. The default
+bank has a few pitches per pet size: small pets squeak, big pets thud.
+Given a storage.BlobCache, the PCM of each tone is saved and reused on
+later runs.
+"""
+import random
+
+import numpy as np
+import pygame
+
+# Base pitches (Hz) of the default bounce tones
+BASE_FREQUENCIES = (220, 330, 440, 550)
+
+# (largest pet width in this class or None, pitch multiplier, duration in ms)
+SIZE_CLASSES = (
+    (80, 1.5, 70),
+    (160, 1.0, 100),
+    (None, 0.7, 150),
+)
+
+# Peak amplitude as a fraction of full scale
+VOLUME = 0.8
+
+
+def tone(frequency, duration_ms, sample_rate, decay=1.0, volume=VOLUME):
+    """Return a decaying sine wave as int16 samples.
+
+    `decay` shapes the envelope (1 - t / duration) ** decay: 1 fades linearly,
+    larger values die away faster.
+    """
+    count = int(duration_ms * sample_rate / 1000.0)
+    t = np.arange(count) / sample_rate
+    envelope = (1.0 - t / (duration_ms / 1000.0)) ** decay
+    wave = np.sin(2.0 * np.pi * frequency * t) * envelope
+    return (wave * (32767 * volume)).astype(np.int16)
+
+
+def make_sound(samples):
+    """Wrap mono int16 samples in a Sound matching the mixer's channel count"""
+    frequency, size, channels = pygame.mixer.get_init()
+    if size != -16:
+        raise ValueError(f"Unsupported mixer sample format {size}, expected signed 16-bit")
+
+    # Interleave the same signal on every channel
+    frames = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.mixer.Sound(buffer=frames.tobytes())
+
+
+class SoundBank:
+    """Bounce sounds grouped by pet size"""
+
+    def __init__(self, variants):
+        # List of (largest width or None, [Sound, ...]) in increasing size
+        self.variants = [(max_width, sounds) for max_width, sounds in variants if sounds]
+
+    @classmethod
+    def single(cls, sounds):
+        """One set of sounds for every pet size (e.g. user-uploaded files)"""
+        return cls([(None, list(sounds))])
+
+    def __len__(self):
+        return sum(len(sounds) for _, sounds in self.variants)
+
+    def sounds_for(self, width):
+        """The sounds meant for a pet of this width"""
+        for max_width, sounds in self.variants:
+            if max_width is None or width <= max_width:
+                return sounds
+        return self.variants[-1][1]
+
+    def pick(self, width=0, intensity=None):
+        """A sound suited to a pet of this width.
+
+        With an `intensity` (0..1) harder hits pick higher-pitched variants
+        (the default bank is ordered low to high); otherwise it is random.
+        """
+        sounds = self.sounds_for(width)
+        if intensity is None:
+            return random.choice(sounds)
+        return sounds[min(int(intensity * len(sounds)), len(sounds) - 1)]
+
+
+def cached_tone(cache, frequency, duration_ms, sample_rate):
+    """tone(), loaded from the disk cache when it has been made before"""
+    if cache is None:
+        return tone(frequency, duration_ms, sample_rate)
+
+    key = ("tone", float(frequency), duration_ms, sample_rate, VOLUME)
+    found = cache.get(key)
+    if found is not None:
+        return found[0]
+    samples = tone(frequency, duration_ms, sample_rate)
+    cache.put(key, samples)
+    return samples
+
+
+def build_default_bank(cache=None):
+    """Synthesize the default bank at the mixer's sample rate"""
+    sample_rate = pygame.mixer.get_init()[0]
+    variants = []
+    for max_width, pitch, duration_ms in SIZE_CLASSES:
+        sounds = [make_sound(cached_tone(cache, frequency * pitch, duration_ms, sample_rate))
+                  for frequency in BASE_FREQUENCIES]
+        variants.append((max_width, sounds))
+    return SoundBank(variants)
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+from audio import COALESCE_SECONDS, MAX_PER_BURST, VoicePool
+
+
+class FakeTime:
+    def __init__(self):
+        self.value = 100.0
+
+    def __call__(self):
+        return self.value
+
+
+class FakeBank:
+    """Hands back the intensity as the 'sound', so plays can be told apart"""
+
+    def pick(self, width, intensity):
+        return intensity
+
+
+class RecordingPool(VoicePool):
+    def __init__(self, now):
+        super().__init__(FakeBank(), now=now)
+        self.played = []
+
+    def _play(self, sound, volume):
+        self.played.append(volume)
+        return True
+
+
+@pytest.fixture
+def mixer():
+    pygame.mixer.init()
+    yield
+    pygame.mixer.quit()
+
+
+def test_a_burst_after_idle_is_coalesced_and_ranked(mixer):
+    time = FakeTime()
+    pool = RecordingPool(time)
+    time.value += 10.0
+
+    # One frame of impacts after a long quiet spell
+    for speed in (2.5, 24, 23, 22):
+        pool.impact(64, speed)
+        pool.update()
+    assert pool.played == []
+
+    time.value += COALESCE_SECONDS
+    pool.update()
+    assert len(pool.played) == MAX_PER_BURST
+    assert pool.played == sorted(pool.played, reverse=True)
+    # The soft hit was the one left out
+    assert min(pool.played) > 0.5
+
+
+def test_silent_impacts_are_ignored(mixer):
+    time = FakeTime()
+    pool = RecordingPool(time)
+    pool.impact(64, 0.5)
+    time.value += 1.0
+    pool.update()
+    assert pool.played == []
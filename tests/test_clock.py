@@ -0,0 +1,43 @@
+import pytest
+
+from clock import SimulationClock
+
+
+class FakeTime:
+    def __init__(self):
+        self.value = 100.0
+
+    def __call__(self):
+        return self.value
+
+
+def test_runs_the_ticks_that_have_accrued():
+    time = FakeTime()
+    clock = SimulationClock(tick=0.25, max_ticks=5, now=time)
+    time.value += 0.875
+    assert clock.advance() == 3
+    assert clock.alpha == pytest.approx(0.5)
+    time.value += 0.125
+    assert clock.advance() == 1
+
+
+def test_catch_up_is_capped_and_the_backlog_dropped():
+    time = FakeTime()
+    clock = SimulationClock(tick=0.25, max_ticks=5, now=time)
+    time.value += 50.0
+    assert clock.advance() == 5
+    assert clock.alpha == 0.0
+    # The stall doesn't carry over into the next frame
+    time.value += 0.25
+    assert clock.advance() == 1
+
+
+def test_reset_forgets_banked_time():
+    time = FakeTime()
+    clock = SimulationClock(tick=0.25, max_ticks=5, now=time)
+    time.value += 0.125
+    clock.advance()
+    time.value += 10.0
+    clock.reset()
+    time.value += 0.125
+    assert clock.advance() == 0
@@ -0,0 +1,91 @@
+from desktop import WINDOW_ID, XPROP_LINE, XWININFO_TREE_LINE, X11WindowProvider
+
+ROOT = """\
+_NET_CLIENT_LIST(WINDOW): window id # 0x1e00003, 0x2200007, 0x2400001
+_NET_ACTIVE_WINDOW(WINDOW): window id # 0x1e00003
+_NET_CURRENT_DESKTOP(CARDINAL) = 0
+"""
+
+TREE = """\
+
+xwininfo: Window id: 0x1e9 (the root window) (has no name)
+
+  Root window id: 0x1e9 (the root window) (has no name)
+  Parent window id: 0x0 (none)
+     3 children:
+     0x1e00003 "xterm": ("xterm" "XTerm")  800x600+0+0  +101+237
+        1 child:
+        0x1e0000a (has no name): ()  1x1+-1+-1  +100+236
+     0x2200007 "Files": ("nautilus" "Nautilus")  640x480+20+40  +20+40
+     0x2400001 "editor": ("gedit" "Gedit")  300x200+-50+0  +-50+0
+"""
+
+PROPERTIES = {
+    0x1e00003: """\
+_NET_WM_PID(CARDINAL) = 4242
+_NET_WM_WINDOW_TYPE(ATOM) = _NET_WM_WINDOW_TYPE_NORMAL
+_NET_FRAME_EXTENTS(CARDINAL) = 1, 1, 30, 1
+_NET_WM_STATE(ATOM) = _NET_WM_STATE_FOCUSED
+_NET_WM_DESKTOP(CARDINAL) = 0
+""",
+    0x2200007: """\
+_NET_WM_PID(CARDINAL) = 4343
+_NET_WM_WINDOW_TYPE(ATOM) = _NET_WM_WINDOW_TYPE_NORMAL
+_NET_FRAME_EXTENTS(CARDINAL) = 0, 0, 0, 0
+_NET_WM_STATE(ATOM) = _NET_WM_STATE_HIDDEN
+_NET_WM_DESKTOP(CARDINAL) = 0
+""",
+    0x2400001: """\
+_NET_WM_PID(CARDINAL) = 4444
+_NET_WM_WINDOW_TYPE(ATOM) = _NET_WM_WINDOW_TYPE_NORMAL
+_NET_FRAME_EXTENTS:  not found.
+_NET_WM_STATE(ATOM) =
+_NET_WM_DESKTOP(CARDINAL) = 4294967295
+""",
+}
+
+
+class RecordedX11WindowProvider(X11WindowProvider):
+    """Answers xprop and xwininfo from the sample output above"""
+
+    def __init__(self):
+        super().__init__(own_pid=1)
+        self.calls = []
+
+    def _run(self, *command):
+        self.calls.append(command)
+        if command[:2] == ("xprop", "-root"):
+            return ROOT
+        if command[0] == "xprop":
+            return PROPERTIES[int(command[2], 16)]
+        return TREE
+
+
+def test_xprop_line_reads_both_value_forms():
+    values = dict(XPROP_LINE.findall(ROOT))
+    assert WINDOW_ID.findall(values["_NET_CLIENT_LIST"]) == ["0x1e00003", "0x2200007", "0x2400001"]
+    assert WINDOW_ID.findall(values["_NET_ACTIVE_WINDOW"]) == ["0x1e00003"]
+    assert values["_NET_CURRENT_DESKTOP"] == "0"
+    # Missing properties have no value to read
+    assert "_NET_FRAME_EXTENTS" not in dict(XPROP_LINE.findall(PROPERTIES[0x2400001]))
+
+
+def test_xwininfo_tree_line_reads_absolute_positions():
+    assert XWININFO_TREE_LINE.findall(TREE) == [
+        ("0x1e00003", "800", "600", "101", "237"),
+        ("0x1e0000a", "1", "1", "100", "236"),
+        ("0x2200007", "640", "480", "20", "40"),
+        ("0x2400001", "300", "200", "-50", "0"),
+    ]
+
+
+def test_x11_provider_lists_shown_windows_with_their_frames():
+    provider = RecordedX11WindowProvider()
+    # The hidden window is skipped; the frameless one sits left of the screen
+    assert provider.windows() == [(100, 207, 902, 838), (-50, 0, 250, 200)]
+    assert len(provider.calls) == 5
+
+    # Known windows under the same focus cost only the two listing calls
+    provider.calls.clear()
+    assert provider.windows() == [(100, 207, 902, 838), (-50, 0, 250, 200)]
+    assert len(provider.calls) == 2
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from masks import SUPPORT_DIRECTIONS, AlphaMask
+
+
+def brute_force_overlap(a, b, dx, dy):
+    """AND of the two opaque arrays with b's top-left corner at (dx, dy) in a"""
+    height = max(a.shape[0], dy + b.shape[0]) - min(0, dy)
+    width = max(a.shape[1], dx + b.shape[1]) - min(0, dx)
+    x0, y0 = -min(0, dx), -min(0, dy)
+    canvas_a = np.zeros((height, width), dtype=bool)
+    canvas_b = np.zeros((height, width), dtype=bool)
+    canvas_a[y0:y0 + a.shape[0], x0:x0 + a.shape[1]] = a
+    canvas_b[y0 + dy:y0 + dy + b.shape[0], x0 + dx:x0 + dx + b.shape[1]] = b
+    return bool((canvas_a & canvas_b).any())
+
+
+def test_overlaps_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(60):
+        a = rng.random((rng.integers(1, 20), rng.integers(1, 30))) < 0.15
+        b = rng.random((rng.integers(1, 20), rng.integers(1, 30))) < 0.15
+        mask_a, mask_b = AlphaMask(a), AlphaMask(b)
+        for dx in range(-b.shape[1] - 1, a.shape[1] + 2):
+            for dy in range(-b.shape[0] - 1, a.shape[0] + 2):
+                assert mask_a.overlaps(mask_b, dx, dy) == brute_force_overlap(a, b, dx, dy), (dx, dy)
+
+
+def test_box_and_area():
+    opaque = np.zeros((10, 12), dtype=bool)
+    opaque[2:5, 3:9] = True
+    mask = AlphaMask(opaque)
+    assert mask.box == (3, 2, 9, 5)
+    assert mask.area == 18
+    assert not mask.empty
+
+
+def test_empty_mask_overlaps_nothing():
+    empty = AlphaMask(np.zeros((8, 8), dtype=bool))
+    solid = AlphaMask(np.ones((8, 8), dtype=bool))
+    assert empty.empty
+    assert not empty.overlaps(solid, 0, 0)
+    assert not solid.overlaps(empty, 0, 0)
+
+
+def test_support_reaches_the_farthest_opaque_pixel():
+    solid = AlphaMask(np.ones((40, 64), dtype=bool))
+    quarter = SUPPORT_DIRECTIONS // 4
+    assert solid.support[[0, quarter, 2 * quarter, 3 * quarter]] == pytest.approx([32, 20, 32, 20])
+    # Towards a corner the box reaches further than any inscribed ellipse
+    assert solid.support[quarter // 2] == pytest.approx((32 + 20) / np.sqrt(2))
+
+    y, x = np.mgrid[:64, :64]
+    disc = AlphaMask((x - 31.5) ** 2 + (y - 31.5) ** 2 <= 32 ** 2)
+    assert np.allclose(disc.support, 32, atol=1)
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+
+from monitors import FakeMonitorProvider, MonitorLayout, MonitorWatcher
+
+# A primary monitor at the origin, a shorter one to its right past a gap
+# and one left of the primary, so the desktop starts at negative x and y
+PRIMARY = (0, 0, 100, 100)
+RIGHT = (150, -20, 250, 50)
+LEFT = (-80, 30, 0, 130)
+
+
+def layout():
+    return MonitorLayout(FakeMonitorProvider([PRIMARY, RIGHT, LEFT]).monitors())
+
+
+def test_extent_spans_every_monitor():
+    monitors = layout()
+    assert (monitors.left, monitors.top, monitors.right, monitors.bottom) == (-80, -20, 250, 130)
+
+
+def test_column_maps_screen_x_with_negative_origin():
+    monitors = layout()
+    assert monitors.column(-80) == 1
+    assert monitors.column(0) == 81
+    assert monitors.column(249) == 330
+    # Everything off the desktop lands in the sentinel columns
+    assert monitors.column(-81) == 0
+    assert monitors.column(-10000) == 0
+    assert monitors.column(250) == 331
+    assert monitors.column(10000) == 331
+    assert list(monitors.column(np.array([-0.5, 0.5]))) == [80, 81]
+
+
+def test_floor_and_ceiling_follow_each_monitor():
+    monitors = layout()
+    for left, top, right, bottom in (PRIMARY, RIGHT, LEFT):
+        columns = monitors.column(np.arange(left, right))
+        assert monitors.covered[columns].all()
+        assert (monitors.ceiling[columns] == top).all()
+        assert (monitors.floor[columns] == bottom).all()
+
+
+def test_gaps_and_sentinels_are_uncovered_but_have_somewhere_to_land():
+    monitors = layout()
+    gap = monitors.column(np.arange(100, 150))
+    assert not monitors.covered[gap].any()
+    assert (monitors.ceiling[gap] == np.inf).all()
+    assert (monitors.floor[gap] == -np.inf).all()
+
+    # Each gap column borrows from the nearest monitor edge
+    assert monitors.land_floor[monitors.column(120)] == PRIMARY[3]
+    assert monitors.land_floor[monitors.column(130)] == RIGHT[3]
+    assert monitors.land_ceiling[monitors.column(130)] == RIGHT[1]
+
+    assert not monitors.covered[0] and not monitors.covered[-1]
+    assert monitors.land_floor[0] == LEFT[3]
+    assert monitors.land_floor[-1] == RIGHT[3]
+
+
+def test_walls_are_the_ends_of_each_stretch():
+    monitors = layout()
+    for x, (start, end) in ((-1, (-80, 0)), (0, (0, 100)), (99, (0, 100)),
+                            (120, (100, 150)), (200, (150, 250))):
+        column = monitors.column(x)
+        assert (monitors.run_start[column], monitors.run_end[column]) == (start, end)
+
+
+def test_overlapping_monitors_take_the_widest_reach():
+    monitors = MonitorLayout([(0, 0, 100, 100), (50, -50, 150, 60)])
+    column = monitors.column(75)
+    assert (monitors.ceiling[column], monitors.floor[column]) == (-50, 100)
+
+
+def test_screen_is_one_monitor_at_the_origin():
+    monitors = MonitorLayout.screen(640, 480)
+    assert (monitors.left, monitors.top, monitors.right, monitors.bottom) == (0, 0, 640, 480)
+    assert monitors.covered[1:-1].all()
+    assert (monitors.run_start[1:-1] == 0).all() and (monitors.run_end[1:-1] == 640).all()
+
+
+def test_empty_rectangles_are_dropped():
+    monitors = MonitorLayout([(0, 0, 100, 100), (200, 0, 200, 100)])
+    assert monitors.right == 100
+
+
+def test_watcher_hands_over_each_new_layout_once():
+    provider = FakeMonitorProvider([PRIMARY])
+    watcher = MonitorWatcher(provider, interval=0.01, slowest_interval=0.02)
+    watcher.start()
+    try:
+        assert wait_for(watcher) == [PRIMARY]
+        provider.rects = [PRIMARY, LEFT]
+        assert wait_for(watcher) == sorted([PRIMARY, LEFT])
+        time.sleep(0.1)
+        assert watcher.take() is None
+    finally:
+        watcher.stop()
+
+
+def wait_for(watcher, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        rects = watcher.take()
+        if rects is not None:
+            return rects
+        time.sleep(0.005)
+    return None
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from physics import PhysicsSettings, PhysicsWorld
+from spatial import RectIndex
+
+# A window in the middle of an 800x600 screen
+WINDOW = (200, 300, 600, 400)
+
+
+def test_rect_index_finds_rectangles_near_each_point():
+    index = RectIndex([WINDOW, (-300, -200, -100, -50)], margin=50, cell_size=64)
+    found = index.query(np.array([[400.0, 350.0], [170.0, 290.0], [-200.0, -100.0], [700.0, 550.0]]))
+    assert 0 in found[0]
+    # Within the margin of the window's corner
+    assert 0 in found[1]
+    assert 1 in found[2] and 0 not in found[2]
+    assert (found[3] == -1).all()
+
+
+def test_empty_rect_index_finds_nothing():
+    index = RectIndex([])
+    assert len(index) == 0
+    assert (index.query(np.array([[10.0, 10.0]])) == -1).all()
+
+
+def test_a_falling_pet_lands_on_a_window():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings()
+    pet = world.add_body(300, 100, 64, 64)
+    world.set_obstacles([WINDOW])
+
+    for _ in range(200):
+        world.step(settings)
+    row = world.index_of(pet)
+    assert world.pos[row].tolist() == pytest.approx([300, WINDOW[1] - 64])
+    assert world.asleep[row]
+
+
+def test_a_pet_bounces_off_a_windows_side():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings(gravity_enabled=False, friction_enabled=False)
+    pet = world.add_body(100, 320, 64, 64, vx=20)
+    world.set_obstacles([WINDOW])
+
+    for _ in range(10):
+        world.step(settings)
+    row = world.index_of(pet)
+    assert world.vel[row][0] == pytest.approx(-20 * settings.bounce_strength)
+    assert world.pos[row][0] + 64 <= WINDOW[0]
+
+
+def test_a_window_opened_over_a_pet_lets_it_fall_out():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings()
+    pet = world.add_body(300, 320, 64, 64)
+    world.set_obstacles([WINDOW])
+
+    for _ in range(100):
+        world.step(settings)
+    row = world.index_of(pet)
+    # Straight down out of the window's bottom onto the floor, not thrown aside
+    assert world.pos[row, 0] == 300
+    assert world.pos[row, 1] == pytest.approx(600 - 64, abs=1)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from masks import AlphaMask
+from physics import PENETRATION_SLOP, PhysicsSettings, PhysicsWorld
+
+
+def round_mask(size):
+    y, x = np.mgrid[:size, :size]
+    return AlphaMask((x - size / 2 + 0.5) ** 2 + (y - size / 2 + 0.5) ** 2 <= (size / 2) ** 2)
+
+
+def test_shapes_are_freed_with_their_last_body():
+    world = PhysicsWorld(800, 600)
+    cat, dog = round_mask(20), round_mask(30)
+    first = world.add_body(0, 0, 40, 40, mask=cat)
+    second = world.add_body(100, 0, 40, 40, mask=cat)
+    third = world.add_body(200, 0, 50, 50, mask=dog)
+    assert world.shape.tolist() == [1, 1, 2]
+
+    world.remove_body(first)
+    assert world.shapes[1] is cat
+    world.remove_body(second)
+    assert world.shapes[1] is None
+    assert id(cat) not in world.shape_index
+
+    # The freed entry is reused, and moved rows keep pointing at their mask
+    fourth = world.add_body(300, 0, 50, 50, mask=round_mask(25))
+    assert world.shape[world.index_of(fourth)] == 1
+    assert world.shapes[world.shape[world.index_of(third)]] is dog
+    assert len(world.shapes) == 3
+
+
+def test_bodies_without_masks_use_no_shape():
+    world = PhysicsWorld(800, 600)
+    pet_id = world.add_body(0, 0, 40, 40)
+    assert world.shape[world.index_of(pet_id)] == 0
+    world.remove_body(pet_id)
+    assert world.shapes == [None]
+
+
+def box_overlap(world, first, second):
+    """How far two bodies' opaque boxes overlap on their shallower axis"""
+    box = np.tile(world.pos, (1, 2)) + world.shape_box
+    a, b = box[world.index_of(first)], box[world.index_of(second)]
+    return min(min(a[2], b[2]) - max(a[0], b[0]), min(a[3], b[3]) - max(a[1], b[1]))
+
+
+def test_solid_boxes_touching_corner_first_are_pushed_apart():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings(gravity_enabled=False)
+    solid = AlphaMask(np.ones((64, 64), dtype=bool))
+    first = world.add_body(100, 100, 64, 64, mask=solid)
+    second = world.add_body(148, 148, 64, 64, mask=solid)
+    assert box_overlap(world, first, second) == 16
+
+    for _ in range(10):
+        world.step(settings)
+    assert box_overlap(world, first, second) <= PENETRATION_SLOP + 0.5
+
+
+def test_boxes_stacked_off_center_come_to_rest():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings()
+    solid = AlphaMask(np.ones((64, 64), dtype=bool))
+    below = world.add_body(300, 536, 64, 64, mask=solid)
+    above = world.add_body(340, 470, 64, 64, mask=solid)
+    for _ in range(300):
+        world.step(settings)
+    assert world.asleep.all()
+    # Resting on the lower box's corner, not slid off it or sunk into it
+    assert world.pos[world.index_of(above)][1] < world.pos[world.index_of(below)][1] - 60
+    assert box_overlap(world, below, above) <= PENETRATION_SLOP + 0.5
+
+
+def test_waking_a_pile_from_below_leaves_the_rest_asleep():
+    world = PhysicsWorld(800, 600)
+    bottom = world.add_body(100, 536, 64, 64)
+    middle = world.add_body(110, 474, 64, 64)
+    top = world.add_body(90, 412, 64, 64)
+    beside = world.add_body(300, 536, 64, 64)
+    world.asleep[:] = True
+
+    world.wake_stacked_on(world.index_of(bottom))
+    awake = {pet_id for pet_id in (bottom, middle, top, beside) if not world.asleep[world.index_of(pet_id)]}
+    assert awake == {middle, top}
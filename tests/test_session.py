@@ -0,0 +1,30 @@
+import json
+
+from session import PET_COLUMNS, SESSION_VERSION, load_session, save_session
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "session.json")
+    session = {
+        "settings": {"gravity_enabled": True, "gravity_strength": 0.5},
+        "assets": {"abc123": {"name": "cat.png", "path": "/tmp/cat.png"}},
+        "selected": "abc123",
+        "pets": [["abc123", 1.0, 10.5, 20.0, 0.0, -1.5, True]],
+    }
+    save_session(path, session)
+    loaded = load_session(path)
+    assert loaded == dict(session, version=SESSION_VERSION)
+    assert dict(zip(PET_COLUMNS, loaded["pets"][0]))["asleep"] is True
+    assert not (tmp_path / "session.json.tmp").exists()
+
+
+def test_missing_file_is_no_session(tmp_path):
+    assert load_session(str(tmp_path / "missing.json")) is None
+
+
+def test_unreadable_or_other_version_is_no_session(tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text("{not json")
+    assert load_session(str(path)) is None
+    path.write_text(json.dumps({"version": SESSION_VERSION + 1, "pets": []}))
+    assert load_session(str(path)) is None
@@ -0,0 +1,28 @@
+import numpy as np
+
+from spatial import SpatialHash
+
+
+def test_every_close_pair_appears_exactly_once():
+    rng = np.random.default_rng(3)
+    cell_size = 50
+    points = rng.uniform(-300, 300, size=(400, 2))
+
+    grid = SpatialHash(cell_size)
+    grid.build(points)
+    first, second = grid.candidate_pairs()
+    pairs = [tuple(sorted(pair)) for pair in zip(first.tolist(), second.tolist())]
+    assert len(pairs) == len(set(pairs))
+    assert all(i != j for i, j in pairs)
+
+    # Anything within a cell of each other sits in the same or an adjacent cell
+    distance = np.abs(points[:, None, :] - points[None, :, :]).max(axis=2)
+    close = {(i, j) for i, j in zip(*np.nonzero(distance < cell_size)) if i < j}
+    assert close <= set(pairs)
+
+
+def test_no_points_no_pairs():
+    grid = SpatialHash(10)
+    grid.build(np.zeros((0, 2)))
+    first, second = grid.candidate_pairs()
+    assert len(first) == len(second) == 0
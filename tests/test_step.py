@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from masks import AlphaMask
+from physics import SLEEP_TICKS, PhysicsSettings, PhysicsWorld
+
+
+def disc_mask(size):
+    y, x = np.mgrid[:size, :size]
+    return AlphaMask((x - size / 2 + 0.5) ** 2 + (y - size / 2 + 0.5) ** 2 <= (size / 2) ** 2)
+
+
+@pytest.mark.parametrize("mask", [None, disc_mask(64)], ids=["circle", "mask"])
+@pytest.mark.parametrize("speed", [80, 120, 200, 300])
+def test_a_throw_stops_at_the_pet_in_its_path(speed, mask):
+    world = PhysicsWorld(1600, 600)
+    settings = PhysicsSettings()
+    target = world.add_body(600, 536, 64, 64, mask=mask)
+    world.asleep[world.index_of(target)] = True
+    # Clear of the target, but one tick's move would carry it past the target's middle
+    start = min(600 - 64 - 2, 600 - speed / 2)
+    thrown = world.add_body(start, 536, 64, 64, vx=speed, mask=mask)
+
+    for _ in range(100):
+        world.step(settings)
+        assert world.pos[world.index_of(thrown)][0] < world.pos[world.index_of(target)][0]
+
+
+def test_the_move_past_a_wall_comes_back_off_it():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings(gravity_enabled=False, friction_enabled=False)
+    pet = world.add_body(700, 300, 64, 64, vx=50)
+
+    world.step(settings)
+    # 14 px past the wall at 736, reflected and scaled like the velocity
+    row = world.index_of(pet)
+    assert world.pos[row][0] == pytest.approx(736 - 14 * settings.bounce_strength)
+    assert world.vel[row][0] == pytest.approx(-50 * settings.bounce_strength)
+
+
+def test_a_pet_at_rest_falls_asleep_after_sleep_ticks():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings()
+    pet = world.add_body(300, 536, 64, 64)
+    row = world.index_of(pet)
+
+    for _ in range(SLEEP_TICKS - 1):
+        world.step(settings)
+    assert not world.asleep[row]
+    world.step(settings)
+    assert world.asleep[row]
+    assert world.all_asleep()
+
+
+def test_a_moving_pet_stays_awake():
+    world = PhysicsWorld(800, 600)
+    settings = PhysicsSettings(gravity_enabled=False, friction_enabled=False, bounce_strength=1.0)
+    pet = world.add_body(300, 300, 64, 64, vx=5)
+    for _ in range(SLEEP_TICKS * 3):
+        world.step(settings)
+    assert not world.asleep[world.index_of(pet)]